@@ -0,0 +1,338 @@
+"""
+On-disk IVF index for approximate nearest-neighbour search over embeddings.
+
+Vectors are L2-normalized and stored row by row in a memory-mapped float32
+file. Once `min_train` vectors exist, spherical k-means splits them into
+about sqrt(N) lists (the "inverted file"); a search scores the query
+against the centroids, then only against the vectors of the `nprobe`
+closest lists. Below `min_train` every search is exact.
+
+Adds are incremental: a new vector is appended and filed under its nearest
+centroid. When the collection has grown `retrain_factor` times since the
+last training, centroids are retrained and every row is reassigned, so the
+lists stay balanced at an amortized O(1) cost per add. Training works on a
+snapshot of the rows outside the index lock; searches and adds only wait
+for the final swap of centroids and lists.
+
+Files in `folder`:
+    vectors.f32     float32 vectors, one row per add (memmap, grown by doubling)
+    lists.i32       IVF list of each row; -1 = not yet trained, -2 = removed
+    keys.txt        one key per row, append-only; a later row replaces an earlier one
+    centroids.npy   centroids from the last training (absent while lists.i32 is rewritten)
+    meta.json       {"dim", "rows", "trained_rows"}
+
+Only one process may open a folder (see index_lock.py).
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from index_lock import lock_folder
+
+_INITIAL_ROWS = 1024
+_UNASSIGNED = -1
+_REMOVED = -2
+
+
+class IVFIndex:
+    """
+    Cosine-similarity nearest neighbours for keyed vectors. The dimension is
+    fixed by the first add (or `dim`). Re-adding a key replaces its vector.
+    """
+
+    def __init__(self, folder, dim=None, nprobe=16, min_train=4096, retrain_factor=4,
+                 seed=0):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_factor = retrain_factor
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()  # One training at a time; taken before _lock, never inside it
+        self._folder_lock = lock_folder(self.folder)
+
+        self._vectors_path = self.folder / "vectors.f32"
+        self._lists_path = self.folder / "lists.i32"
+        self._keys_path = self.folder / "keys.txt"
+        self._centroids_path = self.folder / "centroids.npy"
+        self._meta_path = self.folder / "meta.json"
+
+        meta = {"dim": dim, "rows": 0, "trained_rows": 0}
+        if self._meta_path.exists():
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        self.dim = meta["dim"]
+        self._rows = meta["rows"]
+        self._trained_rows = meta["trained_rows"]
+
+        self._row_keys = []
+        if self._keys_path.exists():
+            with open(self._keys_path, encoding="utf-8") as f:
+                self._row_keys = [line.rstrip("\n") for line in f]
+            if len(self._row_keys) > self._rows:
+                # Interrupted add: drop keys whose rows never made it into meta.json
+                self._row_keys = self._row_keys[:self._rows]
+                self._keys_path.write_text(
+                    "".join(key + "\n" for key in self._row_keys), encoding="utf-8"
+                )
+        self._vectors = self._lists = None
+        if self.dim is not None:
+            self._open(max(_INITIAL_ROWS, self._rows))
+        self._centroids = None
+        if self._centroids_path.exists():
+            self._centroids = np.load(self._centroids_path)
+        elif self._trained_rows:
+            self._trained_rows = 0  # Interrupted training: search exactly until the next one
+
+        self._keys = {}  # key -> row, live rows only
+        for row, key in enumerate(self._row_keys):
+            if self._lists[row] != _REMOVED:
+                self._keys[key] = row
+        self._build_lists()
+
+    # ── Storage ──
+
+    def _open(self, capacity):
+        for name, path, dtype, shape in (
+            ("_vectors", self._vectors_path, np.float32, (capacity, self.dim)),
+            ("_lists", self._lists_path, np.int32, (capacity,)),
+        ):
+            old = getattr(self, name)
+            if old is not None:
+                old.flush()
+            setattr(self, name, None)
+            del old
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if not path.exists():
+                path.touch()
+            if path.stat().st_size < size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)  # New space reads as zeros
+            setattr(self, name, np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+
+    def _ensure_capacity(self, rows):
+        capacity = len(self._lists)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        self._open(capacity)
+
+    def _build_lists(self):
+        # list id -> rows, in row order
+        self._inverted = {}
+        if self._lists is None or self._centroids is None:
+            return
+        lists = np.asarray(self._lists[:self._rows])
+        order = np.argsort(lists, kind="stable")
+        bounds = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+        for list_id in range(len(self._centroids)):
+            rows = order[bounds[list_id]:bounds[list_id + 1]]
+            if len(rows):
+                self._inverted[list_id] = rows.astype(np.int64)
+
+    def _save_meta(self):
+        self._meta_path.write_text(
+            json.dumps({"dim": self.dim, "rows": self._rows, "trained_rows": self._trained_rows}),
+            encoding="utf-8",
+        )
+
+    # ── Writes ──
+
+    def add(self, key, vector):
+        self.add_many([key], [vector])
+
+    def add_many(self, keys, vectors):
+        """Add (or replace) vectors under `keys`, persisting once."""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1))
+        if not len(keys):
+            return
+        if any("\n" in key for key in keys):
+            raise Exception("Vector index keys must not contain newlines.")
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._open(_INITIAL_ROWS)
+            if vectors.shape[1] != self.dim:
+                raise Exception(f"Vector dimension {vectors.shape[1]} does not match the index ({self.dim}).")
+
+            start = self._rows
+            self._ensure_capacity(start + len(keys))
+            self._vectors[start:start + len(keys)] = vectors
+            self._lists[start:start + len(keys)] = _UNASSIGNED
+            for offset, key in enumerate(keys):
+                old = self._keys.get(key)
+                if old is not None:
+                    self._lists[old] = _REMOVED  # Its list entry is skipped from now on
+                self._keys[key] = start + offset
+            self._rows += len(keys)
+            self._row_keys.extend(keys)
+            if self._centroids is not None:
+                self._assign(np.arange(start, self._rows))
+
+            self._vectors.flush()
+            self._lists.flush()
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(key + "\n" for key in keys))
+            self._save_meta()
+
+            live = len(self._keys)
+            due = live >= self.min_train and live >= self._trained_rows * self.retrain_factor
+
+        # Retrain in this thread, but outside the lock; skipped if one is already running
+        if due and self._train_lock.acquire(blocking=False):
+            try:
+                self._train()
+            finally:
+                self._train_lock.release()
+
+    def remove(self, key):
+        with self._lock:
+            row = self._keys.pop(key, None)
+            if row is None:
+                return False
+            self._lists[row] = _REMOVED
+            self._lists.flush()
+            return True
+
+    def train(self):
+        """Retrain centroids and reassign every row now."""
+        with self._train_lock:
+            self._train()
+
+    def _train(self, iterations=10, sample_per_list=64):
+        # Called with _train_lock held and _lock not held. Rows below the
+        # snapshot are never rewritten (adds append, replaced rows are only
+        # marked removed), so they can be read without the lock.
+        with self._lock:
+            if not self._keys:
+                return
+            live = np.fromiter(self._keys.values(), dtype=np.int64)
+            snapshot_rows = self._rows
+            vectors = self._vectors  # Stays mapped even if an add grows the file
+        live.sort()
+        nlist = int(np.clip(np.sqrt(len(live)), 1, 4096))
+        sample = live
+        if len(live) > nlist * sample_per_list:
+            sample = np.sort(self._rng.choice(live, nlist * sample_per_list, replace=False))
+        data = np.asarray(vectors[sample])
+
+        centroids = data[self._rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = _nearest(data, centroids)
+            sizes = np.bincount(labels, minlength=nlist)
+            order = np.argsort(labels, kind="stable")
+            starts = np.cumsum(sizes) - sizes
+            sums = np.zeros_like(centroids)
+            sums[sizes > 0] = np.add.reduceat(data[order], starts[sizes > 0], axis=0)
+            empty = sizes == 0
+            # Re-seed empty lists with random points
+            sums[empty] = data[self._rng.choice(len(data), int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        labels = np.concatenate([
+            _nearest(np.asarray(vectors[live[i:i + 65536]]), centroids)
+            for i in range(0, len(live), 65536)
+        ])
+
+        with self._lock:
+            # Rows removed or replaced since the snapshot stay removed
+            keep = np.asarray(self._lists[live]) != _REMOVED
+            # Until centroids.npy is back, a restart sees an untrained index
+            # rather than lists numbered for the wrong centroids
+            self._centroids_path.unlink(missing_ok=True)
+            self._lists[live[keep]] = labels[keep]
+            self._centroids = centroids
+            added = np.arange(snapshot_rows, self._rows)
+            added = added[np.asarray(self._lists[added]) != _REMOVED]
+            if len(added):
+                self._lists[added] = _nearest(np.asarray(self._vectors[added]), centroids)
+            self._lists.flush()
+            temp = self._centroids_path.with_suffix(".tmp.npy")
+            np.save(temp, centroids)
+            os.replace(temp, self._centroids_path)
+            self._build_lists()
+            self._trained_rows = len(live)
+            self._save_meta()
+
+    def _assign(self, rows):
+        # File new rows under their nearest centroid without touching the rest
+        labels = _nearest(np.asarray(self._vectors[rows]), self._centroids)
+        self._lists[rows] = labels
+        for list_id in np.unique(labels):
+            new = rows[labels == list_id]
+            old = self._inverted.get(list_id)
+            self._inverted[list_id] = new if old is None else np.concatenate([old, new])
+
+    # ── Reads ──
+
+    def get(self, keys):
+        """Stored (normalized) vectors for `keys`, as {key: vector}; unknown keys are skipped."""
+        with self._lock:
+            found = [(key, self._keys[key]) for key in keys if key in self._keys]
+            if not found:
+                return {}
+            rows = np.array([row for _, row in found], dtype=np.int64)
+            order = np.argsort(rows)  # Read the memmap in row order
+            vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+            vectors[order] = self._vectors[rows[order]]
+        return {key: vector for (key, _), vector in zip(found, vectors)}
+
+    def search(self, query, k=10, nprobe=None):
+        """
+        The `k` nearest keys to `query` by cosine similarity, as
+        [(key, similarity)], best first. Exact until the index is trained.
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        with self._lock:
+            if not self._keys:
+                return []
+            if self._centroids is None:
+                rows = np.sort(np.fromiter(self._keys.values(), dtype=np.int64))
+            else:
+                nprobe = min(nprobe or self.nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                parts = [self._inverted[p] for p in probe if p in self._inverted]
+                if not parts:
+                    return []
+                rows = np.sort(np.concatenate(parts))  # Sorted rows read the memmap in order
+                rows = rows[np.asarray(self._lists[rows]) >= 0]  # Drop removed rows
+
+            scores = np.asarray(self._vectors[rows]) @ query
+            if len(rows) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._row_keys[rows[i]], float(scores[i])) for i in top]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._keys)
+
+    def stats(self):
+        with self._lock:
+            sizes = [len(rows) for rows in self._inverted.values()]
+            return {
+                "vectors": len(self._keys),
+                "dim": self.dim,
+                "lists": len(self._centroids) if self._centroids is not None else 0,
+                "largest_list": max(sizes, default=0),
+                "trained_on": self._trained_rows,
+                "nprobe": self.nprobe,
+            }
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def _nearest(data, centroids, chunk=16384):
+    labels = np.empty(len(data), dtype=np.int32)
+    for i in range(0, len(data), chunk):
+        labels[i:i + chunk] = (data[i:i + chunk] @ centroids.T).argmax(axis=1)
+    return labels
@@ -1,13 +1,33 @@
+import io
+import collections
 import os
 import json
+import hashlib
 import time
 import re
+import atexit
+import concurrent.futures
+import threading
 import traceback
+import uuid
 import requests
-import pdfplumber
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 from pathlib import Path
-from resume_helpers import compute_ats_score
+from resume_helpers import ATSScorer, compute_ats_score, flatten_resume_data
+from idf_index import IDFIndex
+from skill_matcher import SkillMatcher
+from keyword_index import KeywordIndex
+from semantic_match import OllamaEmbedder, SemanticMatcher
+from ann_index import IVFIndex
+from pdf_renderer import BrowserPool, wait_until_ready, build_embedded_font_css
+from json_stream import IncrementalJSONParser
+from cache_store import SqliteCache, content_key
+from pdf_extract import extract_word_boxes, pages_to_text
+from cv_parser import parse_cv, cv_brief, cv_to_text
+from job_queue import JobQueue
+from stage_graph import StageGraph
+from ollama_client import build_session
+from llm_scheduler import LLMScheduler, PRIORITY_INTERACTIVE, PRIORITY_RESUME, PRIORITY_BULK
 
 app = Flask(__name__)
 
@@ -15,82 +35,216 @@ app = Flask(__name__)
 UPLOAD_FOLDER = Path(__file__).parent / "uploads"
 OUTPUT_FOLDER = Path(__file__).parent / "output"
 PROMPTS_FOLDER = Path(__file__).parent / "prompts"
+CACHE_FOLDER = Path(__file__).parent / "cache"
+FONTS_FOLDER = Path(__file__).parent / "static" / "fonts"
+INDEX_FOLDER = Path(__file__).parent / "index"
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 OUTPUT_FOLDER.mkdir(exist_ok=True)
+CACHE_FOLDER.mkdir(exist_ok=True)
+INDEX_FOLDER.mkdir(exist_ok=True)
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "qwen2.5:7b"
+SSE_PROGRESS_INTERVAL = 0.25  # Seconds between streamed progress events
+LLM_MAX_IN_FLIGHT = 2         # Concurrent generations; match OLLAMA_NUM_PARALLEL on the server
+LLM_QUEUE_TIMEOUT = 900       # Seconds a request may wait for a free slot
+
+# Ollama HTTP connections: pooled keep-alive with retries on transient errors
+OLLAMA_POOL_SIZE = 10
+OLLAMA_RETRIES = 3            # Connection errors and 502/503/504, with backoff
+OLLAMA_RETRY_BACKOFF = 0.5    # Seconds; doubles per retry
+OLLAMA_CONNECT_TIMEOUT = 5    # Seconds to establish a connection
+OLLAMA_READ_TIMEOUT = 600     # Seconds to wait for (the next chunk of) a response
+
+# LLM response cache: identical prompt + model + options return instantly
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MAX_MB = 200
+LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds
+
+# PDF rendering: warm Chromium pool shared by all requests
+PDF_POOL_BROWSERS = 2           # Chromium processes kept alive
+PDF_POOL_PAGES_PER_BROWSER = 2  # Concurrent renders per browser
+PDF_POOL_MAX_RENDERS = 200      # Recycle a browser after this many renders
+PDF_RENDER_TIMEOUT = 60         # Seconds before a single render is abandoned
+PDF_READY_TIMEOUT_MS = 5000     # Max wait for web fonts before rendering anyway
+PDF_FONT_MODE = "google"        # "google" = Google Fonts link, "embedded" = inline fonts from static/fonts (no network)
+
+# Extracted PDF text cache, keyed by file content hash
+PDF_TEXT_CACHE_MAX_MB = 100
+PDF_TEXT_CACHE_TTL = 30 * 24 * 3600  # Seconds
+PDF_EXTRACTION_VERSION = 2           # Bump when extraction output changes, to invalidate the cache
+
+# Parallel extraction: PDFs with this many pages or more are split across processes
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+PDF_PARALLEL_MIN_PAGES = 3
+
+# Structured CV prompts: extracted CVs are parsed into sections (contact, experience,
+# education, skills...); prompts get a compact rendering that fits the budget by
+# dropping the bullets least relevant to the job first
+CV_STRUCTURED_PROMPTS = True
+CV_PROMPT_MAX_CHARS = 6000  # Resume / Job Kit prompts: trimmed only beyond this
+# Cover letter / gap analysis prompts: only these sections, and only the
+# experience entries most relevant to the job
+CV_BRIEF_SECTIONS = ("summary", "experience", "education", "skills", "certifications")
+CV_BRIEF_EXPERIENCE = 3
+CV_BRIEF_KEEP = 0.5         # Share of the whole CV's rendered length kept...
+CV_BRIEF_MAX_CHARS = 3000   # ...up to this many characters
+
+# Background jobs: pipelines running at once (each holds one Ollama generation)
+JOB_WORKERS = 2
+JOB_RESULT_TTL = 3600  # Seconds a finished job's result is kept for polling
+
+# ATS keyword weighting: IDF learned from every job description seen
+ATS_IDF_ENABLED = True
+ATS_IDF_MIN_DOCS = 20  # Plain frequency weighting until this many JDs have been seen
+
+# ATS phrase matching: multi-word / punctuated skills ("machine learning", "C++")
+ATS_SKILLS_FILE = Path(__file__).parent / "data" / "skills.txt"  # None to disable
+ATS_NGRAM_SIZES = (2, 3)  # Repeated JD bigrams/trigrams also count as keywords
+ATS_NGRAM_MIN_COUNT = 2
+
+# ATS semantic matching: credit for JD keywords the CV paraphrases ("client service" for
+# "customer support"), via a local embedding model (run: ollama pull nomic-embed-text)
+ATS_SEMANTIC_ENABLED = False
+OLLAMA_EMBED_URL = "http://localhost:11434/api/embed"
+OLLAMA_EMBED_MODEL = "nomic-embed-text"
+ATS_SEMANTIC_THRESHOLD = 0.75  # Min cosine similarity between a keyword and a CV line
+ATS_SEMANTIC_CREDIT = 0.8      # Share of a keyword's weight a paraphrase earns (times similarity)
+ATS_SEMANTIC_TIMEOUT = 10      # Seconds for an embedding call; scoring falls back to keywords only
+ATS_SEMANTIC_BUDGET = 0.3      # Seconds a request waits for it; a late result only warms the cache
+EMBED_CACHE_MAX_MB = 100
+
+# Job catalog: stored job descriptions an uploaded CV is ranked against
+CATALOG_TOP_K = 10      # Default number of matches returned
+CATALOG_MAX_TOP_K = 100
+
+# Vector search: whole-document embeddings of catalog jobs and corpus CVs in on-disk IVF
+# indexes, so matches that share meaning but few keywords are found too
+# (uses the ATS_SEMANTIC_ENABLED embedding model)
+VECTOR_SEARCH_ENABLED = True
+VECTOR_NPROBE = 16         # IVF lists scanned per search: recall vs. latency, see benchmark_ann.py
+VECTOR_SEARCH_WEIGHT = 0.3 # Share of embedding similarity in the ranking (rest: ATS score)
+EMBED_DOC_MAX_WORDS = 400  # Leading words of a CV / JD embedded for vector search
+
+# ATS uplift tracking: original CV vs. tailored resume, appended per generation
+ATS_LOG_PATH = CACHE_FOLDER / "ats_uplift.jsonl"  # Set to None to keep history in memory only
+ATS_HISTORY_SIZE = 500  # Recent generations summarised by /stats/ats
+
+# Request pipelines: threads running independent stages (ATS, LLM, PDF, preview) side by side
+PIPELINE_WORKERS = 16
 
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max upload
 
 
 # ─────────────────────────────────────────────
-# PDF Text Extraction
+# Lazy Resources
 # ─────────────────────────────────────────────
 
-def extract_text_from_pdf(pdf_path):
+class Lazy:
     """
-    Extract text from a PDF, handling multi-column layouts
-    by splitting into left/right columns based on page midpoint.
+    A module-level resource built by `factory` on first use; attribute
+    access, len() and `in` go to the built object. Under `python app.py`
+    every PDF extraction worker (a spawned process) re-runs this module,
+    so anything that opens files, takes a folder lock or starts threads
+    must not happen at import.
     """
-    pdf = pdfplumber.open(pdf_path)
-    all_text = []
 
-    for page in pdf.pages:
-        w = page.width
-        words = page.extract_words(
-            x_tolerance=2, y_tolerance=2, keep_blank_chars=False
-        )
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
 
-        if not words:
-            # Fallback: try basic extract_text
-            text = page.extract_text()
-            if text:
-                all_text.append(text)
-            continue
+    def _object(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
 
-        # Split into columns
-        mid = w * 0.35  # Typical sidebar boundary
+    def __getattr__(self, name):
+        return getattr(self._object(), name)
+
+    def __len__(self):
+        return len(self._object())
+
+    def __bool__(self):
+        return bool(self._object())
+
+    def __contains__(self, item):
+        return item in self._object()
+
+
+# ─────────────────────────────────────────────
+# PDF Text Extraction
+# ─────────────────────────────────────────────
+
+pdf_text_cache = Lazy(lambda: SqliteCache(
+    CACHE_FOLDER / "pdf_text_cache.sqlite3",
+    table="pdf_text",
+    max_bytes=PDF_TEXT_CACHE_MAX_MB * 1024 * 1024,
+    ttl=PDF_TEXT_CACHE_TTL,
+))
+
+
+def file_sha256(path):
+    """Hash a file's content in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pdf_cached(pdf_path):
+    """
+    Extract word boxes and text for a PDF, cached by the file's content hash,
+    so the same CV uploaded against many job descriptions is parsed once.
+    Returns {"sha256", "pages", "text", "structure"}; structure is the
+    section-aware parse (cv_parser.parse_cv), or None if parsing failed.
+    """
+    sha = file_sha256(pdf_path)
+    key = content_key("pdf-text", PDF_EXTRACTION_VERSION, sha)
+    cached = pdf_text_cache.get(key)
+    if cached is not None:
+        structure_key = cv_structure_key(cached["text"])
+        if cached.get("structure") is not None and pdf_text_cache.get(structure_key) is None:
+            # Evicted on its own (or never written): the prompts need it back
+            pdf_text_cache.set(structure_key, cached["structure"])
+        return cached
+
+    pages = extract_word_boxes(
+        pdf_path,
+        workers=PDF_EXTRACT_WORKERS,
+        parallel_min_pages=PDF_PARALLEL_MIN_PAGES,
+    )
+    structure = None
+    try:
+        structure = parse_cv(pages)
+    except Exception:
+        traceback.print_exc()  # Prompts fall back to the plain text
+    result = {
+        "sha256": sha,
+        "pages": pages,
+        "text": pages_to_text(pages),
+        "structure": structure,
+    }
+    pdf_text_cache.set(key, result)
+    if structure is not None:
+        # Also findable by the text alone: follow-up endpoints only get cv_text back
+        pdf_text_cache.set(cv_structure_key(result["text"]), structure)
+    return result
 
-        left_words = sorted(
-            [x for x in words if x["x0"] < mid],
-            key=lambda x: (round(x["top"] / 5) * 5, x["x0"]),
-        )
-        right_words = sorted(
-            [x for x in words if x["x0"] >= mid],
-            key=lambda x: (round(x["top"] / 5) * 5, x["x0"]),
-        )
 
-        def words_to_text(word_list):
-            if not word_list:
-                return ""
-            lines = []
-            current_y = None
-            current_line = []
-            for w_item in word_list:
-                y = round(w_item["top"] / 5) * 5
-                if current_y is not None and y != current_y:
-                    lines.append(" ".join(current_line))
-                    current_line = []
-                current_line.append(w_item["text"])
-                current_y = y
-            if current_line:
-                lines.append(" ".join(current_line))
-            return "\n".join(lines)
-
-        left_text = words_to_text(left_words)
-        right_text = words_to_text(right_words)
-
-        combined = ""
-        if left_text.strip():
-            combined += "=== SIDEBAR ===\n" + left_text + "\n\n"
-        if right_text.strip():
-            combined += "=== MAIN CONTENT ===\n" + right_text
-
-        all_text.append(combined)
-
-    pdf.close()
-    return "\n\n".join(all_text)
+def cv_structure_key(cv_text):
+    return content_key("cv-structure", PDF_EXTRACTION_VERSION, cv_text)
+
+
+def extract_text_from_pdf(pdf_path):
+    """
+    Extract text from a PDF, handling multi-column layouts
+    by splitting into left/right columns based on page midpoint.
+    """
+    return extract_pdf_cached(pdf_path)["text"]
 
 
 # ─────────────────────────────────────────────
@@ -98,6 +252,24 @@ def extract_text_from_pdf(pdf_path):
 # ─────────────────────────────────────────────
 
 
+llm_cache = (
+    Lazy(lambda: SqliteCache(
+        CACHE_FOLDER / "llm_cache.sqlite3",
+        table="llm_responses",
+        max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+        ttl=LLM_CACHE_TTL,
+    ))
+    if LLM_CACHE_ENABLED
+    else None
+)
+
+
+llm_scheduler = LLMScheduler(max_in_flight=LLM_MAX_IN_FLIGHT)
+ollama_session = build_session(
+    pool_size=OLLAMA_POOL_SIZE, retries=OLLAMA_RETRIES, backoff=OLLAMA_RETRY_BACKOFF
+)
+
+
 def load_prompt(filename):
     """Load a prompt from the prompts folder."""
     prompt_path = PROMPTS_FOLDER / filename
@@ -108,16 +280,13 @@ def load_system_prompt():
     return load_prompt("tailor_resume.txt")
 
 
-def call_ollama(system_prompt, user_prompt, max_tokens=4096):
-    """
-    Call the Ollama API and return the response text.
-    max_tokens controls the output length (use higher for unified generation).
-    """
-    payload = {
+def build_ollama_payload(system_prompt, user_prompt, max_tokens=4096, stream=False):
+    """Build the /api/generate request body shared by all Ollama calls."""
+    return {
         "model": OLLAMA_MODEL,
         "system": system_prompt,
         "prompt": user_prompt,
-        "stream": False,
+        "stream": stream,
         "options": {
             "temperature": 0.3,       # Lower = more focused/deterministic
             "num_predict": max_tokens, # Max tokens for output
@@ -126,11 +295,47 @@ def call_ollama(system_prompt, user_prompt, max_tokens=4096):
         "format": "json",
     }
 
+
+def llm_cache_key(payload):
+    """Cache key for an Ollama request: prompts, model and options, not transport flags."""
+    return content_key({k: v for k, v in payload.items() if k != "stream"})
+
+
+def store_llm_response(key, text):
+    """Cache a response, but only if it parses - never replay output the caller rejects."""
+    if llm_cache is None:
+        return
+    try:
+        parse_llm_response(text)
+    except Exception:
+        return
+    llm_cache.set(key, text)
+
+
+def call_ollama(system_prompt, user_prompt, max_tokens=4096, use_cache=True,
+                client_id="anonymous", priority=PRIORITY_RESUME):
+    """
+    Call the Ollama API and return the response text.
+    max_tokens controls the output length (use higher for unified generation).
+    Responses are cached by prompt + model + options; use_cache=False bypasses it.
+    Cache misses wait for a slot from the scheduler (fair per client_id, by priority).
+    """
+    payload = build_ollama_payload(system_prompt, user_prompt, max_tokens)
+    key = llm_cache_key(payload)
+    if use_cache and llm_cache is not None:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=600)
+        with llm_scheduler.slot(client_id, priority, timeout=LLM_QUEUE_TIMEOUT):
+            response = ollama_session.post(
+                OLLAMA_URL, json=payload,
+                timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT),
+            )
         response.raise_for_status()
         result = response.json()
-        return result.get("response", "")
+        text = result.get("response", "")
     except requests.exceptions.ConnectionError:
         raise Exception(
             "Cannot connect to Ollama. Make sure Ollama is running "
@@ -144,6 +349,76 @@ def call_ollama(system_prompt, user_prompt, max_tokens=4096):
     except Exception as e:
         raise Exception(f"Ollama error: {str(e)}")
 
+    store_llm_response(key, text)
+    return text
+
+
+def stream_ollama(system_prompt, user_prompt, max_tokens=4096, use_cache=True,
+                  client_id="anonymous", priority=PRIORITY_RESUME):
+    """
+    Stream a generation from Ollama, consuming its NDJSON output line by line.
+    Yields dicts: {"text", "tokens", "tokens_per_sec", "done"}.
+    Closing the generator closes the HTTP connection, which makes Ollama
+    stop generating (this is how a cancelled request stops the model).
+    A cache hit is yielded as a single, final chunk. The scheduler slot is
+    held until the stream ends or is closed.
+    """
+    payload = build_ollama_payload(system_prompt, user_prompt, max_tokens, stream=True)
+    key = llm_cache_key(payload)
+    if use_cache and llm_cache is not None:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield {"text": cached, "tokens": 0, "tokens_per_sec": 0.0, "done": True}
+            return
+
+    started = time.time()
+    tokens = 0
+    parts = []
+    finished = False
+
+    try:
+        # The read timeout is per chunk here, so it bounds stalls rather than the whole generation
+        with llm_scheduler.slot(client_id, priority, timeout=LLM_QUEUE_TIMEOUT), \
+                ollama_session.post(
+                    OLLAMA_URL, json=payload, stream=True,
+                    timeout=(OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT),
+                ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise Exception(chunk["error"])
+                tokens += 1
+                if chunk.get("done"):
+                    # Ollama reports exact counts on the final chunk
+                    tokens = chunk.get("eval_count", tokens)
+                    finished = True
+                parts.append(chunk.get("response", ""))
+                elapsed = time.time() - started
+                yield {
+                    "text": chunk.get("response", ""),
+                    "tokens": tokens,
+                    "tokens_per_sec": round(tokens / elapsed, 1) if elapsed > 0 else 0.0,
+                    "done": bool(chunk.get("done")),
+                }
+    except requests.exceptions.ConnectionError:
+        raise Exception(
+            "Cannot connect to Ollama. Make sure Ollama is running "
+            "(run 'ollama serve' in a terminal)."
+        )
+    except requests.exceptions.Timeout:
+        raise Exception(
+            "Ollama request timed out. The model may be too slow for this task. "
+            "Try a smaller input or a faster model."
+        )
+    except Exception as e:
+        raise Exception(f"Ollama error: {str(e)}")
+
+    if finished:
+        store_llm_response(key, "".join(parts))
+
 
 def parse_llm_response(response_text):
     """
@@ -312,59 +587,848 @@ def normalize_resume_data(data):
 # PDF Generation
 # ─────────────────────────────────────────────
 
+def start_browser_pool():
+    pool = BrowserPool(
+        browsers=PDF_POOL_BROWSERS,
+        pages_per_browser=PDF_POOL_PAGES_PER_BROWSER,
+        max_renders=PDF_POOL_MAX_RENDERS,
+    )
+    atexit.register(pool.shutdown)
+    return pool
+
+
+browser_pool = Lazy(start_browser_pool)
+
+# Concurrent LLM calls for the fan-out Job Kit mode (three prompts per request)
+fanout_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=3 * JOB_WORKERS, thread_name_prefix="llm-fanout"
+)
+
+# Stage-graph pipelines behind /generate and /generate_jobkit
+pipeline_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline"
+)
+
+# Background renders (e.g. starting the PDF while the LLM is still streaming)
+render_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=PDF_POOL_BROWSERS * PDF_POOL_PAGES_PER_BROWSER,
+    thread_name_prefix="pdf-render",
+)
+
+
+def render_cv_html(resume_data):
+    """Render the resume data into the CV HTML template."""
+    font_css = None
+    if PDF_FONT_MODE == "embedded":
+        font_css = build_embedded_font_css(str(FONTS_FOLDER))
+    with app.app_context():
+        return render_template("cv_template.html", cv=resume_data, font_css=font_css)
+
+
+def pdf_render_fn(html_content, label="cv"):
+    """Build the page coroutine that turns CV HTML into PDF bytes (run by the browser pool)."""
+    async def _to_pdf(page):
+        await page.set_content(html_content, wait_until="domcontentloaded")
+        waited_ms = await wait_until_ready(page, PDF_READY_TIMEOUT_MS)
+        print(f"[pdf] {label}: fonts ready after {waited_ms} ms")
+        return await page.pdf(
+            format="A4",
+            print_background=True,
+            margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
+        )
+
+    return _to_pdf
+
+
+def render_pdf_bytes(resume_data, label="cv"):
+    """
+    Render the resume data straight to PDF bytes in memory.
+    The HTML is loaded with set_content, so nothing is written to disk.
+    """
+    html_content = render_cv_html(resume_data)
+    return browser_pool.run(pdf_render_fn(html_content, label), timeout=PDF_RENDER_TIMEOUT)
+
+
 def generate_pdf_from_data(resume_data, output_filename):
     """
-    Render the resume data into an HTML template,
-    then convert to PDF using Playwright.
+    Render the resume data to PDF and save it in the output folder.
+    Returns the path of the saved PDF.
     """
-    # Render HTML from template
-    with app.app_context():
-        html_content = render_template("cv_template.html", cv=resume_data)
-
-    # Save temp HTML
-    temp_html = OUTPUT_FOLDER / f"{output_filename}.html"
-    with open(temp_html, "w", encoding="utf-8") as f:
-        f.write(html_content)
-
-    # Convert to PDF using Playwright
-    import asyncio
-    from playwright.async_api import async_playwright
-
-    async def _to_pdf():
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page()
-            await page.goto(f"file:///{str(temp_html).replace(os.sep, '/')}")
-            await page.wait_for_timeout(2000)  # Wait for fonts
-            pdf_path = str(OUTPUT_FOLDER / f"{output_filename}.pdf")
-            await page.pdf(
-                path=pdf_path,
-                format="A4",
-                print_background=True,
-                margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
-            )
-            await browser.close()
-            return pdf_path
+    return save_pdf_from_html(render_cv_html(resume_data), output_filename)
+
+
+def save_pdf_from_html(html_content, output_filename):
+    """Render already-built CV HTML to PDF and save it in the output folder."""
+    pdf_bytes = browser_pool.run(
+        pdf_render_fn(html_content, output_filename), timeout=PDF_RENDER_TIMEOUT
+    )
+    pdf_path = str(OUTPUT_FOLDER / f"{output_filename}.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(pdf_bytes)
+    return pdf_path
+
+
+def save_html_preview(html_content, output_filename):
+    """Save the CV HTML next to the PDF so it can be previewed in the browser."""
+    html_path = OUTPUT_FOLDER / f"{output_filename}.html"
+    html_path.write_text(html_content, encoding="utf-8")
+    return str(html_path)
+
+
+# ─────────────────────────────────────────────
+# Pipeline Helpers
+# ─────────────────────────────────────────────
+
+def check_upload_form(files, form, require_job_description=True):
+    """
+    Validate the PDF upload + job description form (Flask's or Quart's
+    request.files / request.form). Returns (pdf_file, job_description, None)
+    or (None, None, error message).
+    """
+    if "pdf" not in files:
+        return None, None, "No PDF file uploaded"
+
+    pdf_file = files["pdf"]
+    job_description = form.get("job_description", "").strip()
+
+    if pdf_file.filename == "":
+        return None, None, "No file selected"
+
+    if not pdf_file.filename.lower().endswith(".pdf"):
+        return None, None, "File must be a PDF"
+
+    if require_job_description and not job_description:
+        return None, None, "Job description is required"
+
+    return pdf_file, job_description, None
 
-    # Run async in sync context
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                pdf_path = pool.submit(asyncio.run, _to_pdf()).result()
-        else:
-            pdf_path = loop.run_until_complete(_to_pdf())
-    except RuntimeError:
-        pdf_path = asyncio.run(_to_pdf())
 
-    # Clean up temp HTML
+def read_upload_form(require_job_description=True):
+    """
+    Validate the PDF upload + job description form.
+    Returns (pdf_file, job_description, None) or (None, None, error_response).
+    """
+    pdf_file, job_description, message = check_upload_form(
+        request.files, request.form, require_job_description
+    )
+    if message:
+        return None, None, (jsonify({"error": message}), 400)
+    return pdf_file, job_description, None
+
+
+def upload_path_for(filename, run_id):
+    """
+    Where an uploaded PDF is saved in the uploads folder. `run_id` is a
+    fresh uuid4 per request, which also names its outputs
+    (tailored_cv_<run_id>), so concurrent requests never share a file.
+    """
+    safe_name = re.sub(r"[^a-zA-Z0-9_.-]", "_", filename)
+    return UPLOAD_FOLDER / f"{run_id}_{safe_name}"
+
+
+def save_upload(pdf_file, run_id):
+    """Save the uploaded PDF to the uploads folder and return its path."""
+    upload_path = upload_path_for(pdf_file.filename, run_id)
+    pdf_file.save(str(upload_path))
+    return upload_path
+
+
+def remove_upload(upload_path):
     try:
-        os.remove(temp_html)
+        os.remove(str(upload_path))
     except OSError:
         pass
 
-    return pdf_path
+
+def cv_for_prompt(cv_text, job_description, brief=False):
+    """
+    The CV as sent to the LLM. If it was parsed into sections at extraction
+    and the parse looks trustworthy, a compact rendering that drops the
+    bullets least relevant to the job (by ATS keyword weight) first if it
+    is over CV_PROMPT_MAX_CHARS (see cv_to_text for what is never dropped).
+    A `brief` (cover letter, gap analysis) is first narrowed to
+    CV_BRIEF_SECTIONS and the CV_BRIEF_EXPERIENCE most relevant jobs, then
+    trimmed to CV_BRIEF_KEEP of the CV's length. Otherwise the extracted
+    text, cut at a line to CV_BRIEF_MAX_CHARS for a brief.
+    """
+    structure = None
+    if CV_STRUCTURED_PROMPTS:
+        structure = pdf_text_cache.get(cv_structure_key(cv_text))
+    if not structure or not structure["reliable"]:
+        if brief and len(cv_text) > CV_BRIEF_MAX_CHARS:
+            return cv_text[:CV_BRIEF_MAX_CHARS].rsplit("\n", 1)[0]
+        return cv_text
+    weights = {word: count * idf for word, count, idf in ats_scorer.top(job_description)}
+
+    def relevance(text):
+        return sum(weights.get(word, 0) for word in ats_scorer.cv_keywords(text))
+
+    if brief:
+        max_chars = min(CV_BRIEF_MAX_CHARS, int(len(cv_to_text(structure)) * CV_BRIEF_KEEP))
+        structure = cv_brief(structure, CV_BRIEF_SECTIONS, relevance, CV_BRIEF_EXPERIENCE)
+        return cv_to_text(structure, relevance, max_chars)
+    return cv_to_text(structure, relevance, CV_PROMPT_MAX_CHARS)
+
+
+def build_resume_prompts(cv_text, job_description):
+    """Build the (system, user) prompts for a standalone tailored resume."""
+    system_prompt = load_system_prompt()
+    cv_text = cv_for_prompt(cv_text, job_description)
+    user_prompt = (
+        f"Here is the candidate's current resume:\n\n"
+        f"---\n{cv_text}\n---\n\n"
+        f"Here is the target job description:\n\n"
+        f"---\n{job_description}\n---\n\n"
+        f"Analyze the job description, map the candidate's experience to the requirements, "
+        f"and produce the tailored resume as a JSON object. "
+        f"Remember: only output valid JSON, nothing else."
+    )
+    return system_prompt, user_prompt
+
+
+def build_jobkit_prompts(cv_text, job_description):
+    """Build the (system, user) prompts for the unified Job Kit call."""
+    system_prompt = load_prompt("unified_jobkit.txt")
+    cv_text = cv_for_prompt(cv_text, job_description)
+    user_prompt = (
+        f"Here is the candidate's current resume:\n\n"
+        f"---\n{cv_text}\n---\n\n"
+        f"Here is the target job description:\n\n"
+        f"---\n{job_description}\n---\n\n"
+        f"Generate the complete Job Kit: tailored resume, cover letter, and gap analysis. "
+        f"Output ONLY the JSON object with keys: resume, cover_letter, gap_analysis."
+    )
+    return system_prompt, user_prompt
+
+
+def finish_jobkit(llm_response, cv_text, job_description, run_id,
+                  full_data=None, pdf_future=None, ats_analysis=None):
+    """
+    Parse the unified LLM response, render the PDF and score the CV.
+    Streaming callers can pass the already-parsed `full_data`, a
+    `pdf_future` for a render they started early and the `ats_analysis`
+    they already sent.
+    """
+    # Parse the unified response
+    if full_data is None:
+        full_data = parse_llm_response(llm_response)
+    resume_data, cover_letter_data, gap_analysis_data = unpack_jobkit(full_data)
+
+    # Generate PDF (or wait for the one started while streaming)
+    output_name = f"tailored_cv_{run_id}"
+    if pdf_future is not None:
+        pdf_future.result()
+    else:
+        generate_pdf_from_data(resume_data, output_name)
+
+    return jobkit_response(
+        output_name, resume_data, cv_text, job_description,
+        cover_letter_data, gap_analysis_data, ats_analysis=ats_analysis,
+    )
+
+
+def generate_jobkit_fanout(cv_text, job_description, use_cache=True, client_id="anonymous"):
+    """
+    Fan-out alternative to the single unified call: issue the resume, cover
+    letter and gap analysis prompts as three concurrent Ollama requests and
+    join them into the unified {"resume", "cover_letter", "gap_analysis"}
+    shape. Wall-clock time is roughly the slowest of the three, provided
+    Ollama serves them in parallel (OLLAMA_NUM_PARALLEL >= 3 and
+    LLM_MAX_IN_FLIGHT >= 3).
+    """
+    sections = {
+        "resume": build_resume_prompts(cv_text, job_description),
+        "cover_letter": build_cover_letter_prompts(cv_text, job_description),
+        "gap_analysis": build_gap_analysis_prompts(cv_text, job_description),
+    }
+    futures = {
+        name: fanout_executor.submit(
+            call_ollama, system_prompt, user_prompt,
+            use_cache=use_cache, client_id=client_id, priority=PRIORITY_BULK,
+        )
+        for name, (system_prompt, user_prompt) in sections.items()
+    }
+    return {name: parse_llm_response(future.result()) for name, future in futures.items()}
+
+
+def unpack_jobkit(full_data):
+    """Split the unified response into (normalized resume, cover letter, gap analysis)."""
+    # Extract and normalize each section
+    resume_data = full_data.get("resume", full_data)  # Fallback: if flat, treat whole thing as resume
+    cover_letter_data = full_data.get("cover_letter", {})
+    gap_analysis_data = full_data.get("gap_analysis", {})
+
+    # Normalize resume data for template
+    resume_data = normalize_resume_data(resume_data)
+    return resume_data, cover_letter_data, gap_analysis_data
+
+
+# Corpus of job descriptions for IDF weighting (memory-mapped, updated per JD;
+# opened on first use, see Lazy)
+jd_idf_index = None
+if ATS_IDF_ENABLED:
+    jd_idf_index = Lazy(lambda: IDFIndex(CACHE_FOLDER / "jd_idf", min_documents=ATS_IDF_MIN_DOCS))
+ats_scorer = Lazy(lambda: ATSScorer(
+    idf=jd_idf_index,
+    skills=SkillMatcher.from_file(ATS_SKILLS_FILE) if ATS_SKILLS_FILE else None,
+    ngram_sizes=ATS_NGRAM_SIZES,
+    ngram_min_count=ATS_NGRAM_MIN_COUNT,
+))
+
+
+# Embedding-based partial credit for paraphrased keywords (optional)
+semantic_matcher = None
+if ATS_SEMANTIC_ENABLED:
+    semantic_matcher = Lazy(lambda: SemanticMatcher(
+        OllamaEmbedder(
+            OLLAMA_EMBED_URL,
+            OLLAMA_EMBED_MODEL,
+            # Not routed through llm_scheduler: embedding calls are short and
+            # must not queue behind long generations
+            session=ollama_session,
+            cache=SqliteCache(
+                CACHE_FOLDER / "embed_cache.sqlite3",
+                table="embeddings",
+                max_bytes=EMBED_CACHE_MAX_MB * 1024 * 1024,
+            ),
+            timeout=(OLLAMA_CONNECT_TIMEOUT, ATS_SEMANTIC_TIMEOUT),
+        ),
+        threshold=ATS_SEMANTIC_THRESHOLD,
+        credit=ATS_SEMANTIC_CREDIT,
+    ))
+
+
+# Semantic passes run beside the request; a few at most, so a slow or
+# unreachable embedding model cannot pile up work
+semantic_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="ats-semantic"
+)
+semantic_slots = threading.BoundedSemaphore(4)
+
+
+def start_ats(cv_text, job_description):
+    """
+    Keyword ATS score with IDF weighting (the job description joins the IDF
+    corpus first), plus, with semantic matching on, a future for the
+    semantic pass. Returns (analysis, future or None); see with_semantic().
+    """
+    if jd_idf_index is not None:
+        jd_idf_index.add(job_description, ats_scorer.keywords(job_description))
+    coverage = ats_scorer.coverage(cv_text, job_description)
+    analysis = ats_scorer.score_coverage(coverage)
+    if semantic_matcher is None or not coverage:
+        return analysis, None
+    if not semantic_slots.acquire(blocking=False):
+        print("[ats] semantic matching skipped: embedding model busy")
+        return analysis, None
+
+    def semantic():
+        started = time.time()
+        result = semantic_matcher.score(cv_text, coverage, analysis["score"])
+        result["ms"] = round((time.time() - started) * 1000)
+        return result
+
+    future = semantic_executor.submit(semantic)
+    future.add_done_callback(lambda _: semantic_slots.release())
+    return analysis, future
+
+
+def with_semantic(analysis, future, wait=ATS_SEMANTIC_BUDGET):
+    """
+    Add the semantic pass to `analysis` as "semantic" (the score with credit
+    for paraphrased keywords, and which ones they were) if it finishes
+    within `wait` seconds. A late pass keeps running and warms the
+    embedding cache for the next request; the keyword score stands on its own.
+    """
+    if future is None:
+        return analysis
+    try:
+        analysis["semantic"] = future.result(timeout=wait)
+    except concurrent.futures.TimeoutError:
+        print(f"[ats] semantic matching over budget ({wait}s), keyword score only")
+    except Exception as e:
+        print(f"[ats] semantic matching skipped: {e}")
+    return analysis
+
+
+def score_ats(cv_text, job_description, semantic_wait=ATS_SEMANTIC_BUDGET):
+    """ATS analysis of a CV: start_ats() + with_semantic() within `semantic_wait` seconds."""
+    analysis, future = start_ats(cv_text, job_description)
+    return with_semantic(analysis, future, semantic_wait)
+
+
+ats_history = collections.deque(maxlen=ATS_HISTORY_SIZE)
+ats_history_lock = threading.Lock()
+
+
+def score_tailored_resume(ats_analysis, resume_data, job_description):
+    """
+    Score the tailored resume against the job description, from its parsed
+    structure (no extra LLM call), and record the uplift over the original
+    CV's score. Returns (tailored ATS analysis, uplift in points).
+    """
+    ats_tailored = compute_ats_score(
+        flatten_resume_data(resume_data), job_description, scorer=ats_scorer
+    )
+    uplift = ats_tailored["score"] - ats_analysis["score"]
+
+    entry = {
+        "time": int(time.time()),
+        "model": OLLAMA_MODEL,
+        "before": ats_analysis["score"],
+        "after": ats_tailored["score"],
+        "uplift": uplift,
+    }
+    with ats_history_lock:
+        ats_history.append(entry)
+        if ATS_LOG_PATH is not None:
+            try:
+                with open(ATS_LOG_PATH, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError:
+                traceback.print_exc()
+    return ats_tailored, uplift
+
+
+def jobkit_response(output_name, resume_data, cv_text, job_description,
+                    cover_letter_data, gap_analysis_data, ats_analysis=None,
+                    tailored_score=None):
+    """
+    Score the original CV and the tailored resume (unless already scored;
+    `tailored_score` is what score_tailored_resume returned) and assemble
+    the Job Kit response body.
+    """
+    # Compute ATS Score (pure Python, instant)
+    if ats_analysis is None:
+        ats_analysis = score_ats(cv_text, job_description)
+    if tailored_score is None:
+        tailored_score = score_tailored_resume(ats_analysis, resume_data, job_description)
+    ats_tailored, ats_uplift = tailored_score
+
+    return {
+        "success": True,
+        "download_url": f"/download/{output_name}.pdf",
+        "resume_data": resume_data,
+        "ats_score": ats_analysis,
+        "ats_tailored": ats_tailored,
+        "ats_uplift": ats_uplift,
+        "cv_text": cv_text,
+        "cover_letter": cover_letter_data,
+        "gap_analysis": gap_analysis_data,
+    }
+
+
+def run_tailoring_pipeline(generate, cv_text, job_description, upload_path, output_name):
+    """
+    Run the post-extraction pipeline as a stage graph:
+
+        generate -> sections -> html -> pdf
+                                     -> preview
+        ats        (needs only the extracted text)
+        ats + sections -> ats_tailored
+        cleanup    (upload is no longer needed; not waited for)
+
+    The semantic ATS pass starts with "ats" and is collected in
+    "ats_tailored", so it has the whole generation to finish.
+
+    `generate()` returns the parsed LLM output (unified Job Kit or a bare
+    resume). Returns (resume, cover letter, gap analysis, ATS analysis,
+    (tailored ATS analysis, uplift)).
+    """
+    graph = StageGraph()
+    graph.add("ats", lambda: start_ats(cv_text, job_description))
+    graph.add("cleanup", lambda: remove_upload(upload_path), critical=False)
+    graph.add("generate", generate)
+    graph.add("sections", unpack_jobkit, after=("generate",))
+    graph.add(
+        "ats_tailored",
+        lambda ats, sections: score_tailored_resume(with_semantic(*ats), sections[0], job_description),
+        after=("ats", "sections"),
+    )
+    graph.add("html", lambda sections: render_cv_html(sections[0]), after=("sections",))
+    graph.add("pdf", lambda html: save_pdf_from_html(html, output_name), after=("html",))
+    graph.add("preview", lambda html: save_html_preview(html, output_name), after=("html",))
+
+    results = graph.run(pipeline_executor)
+    print(f"[pipeline] {output_name}: {graph.timings()}")
+    resume_data, cover_letter_data, gap_analysis_data = results["sections"]
+    return (
+        resume_data, cover_letter_data, gap_analysis_data,
+        results["ats"][0], results["ats_tailored"],
+    )
+
+
+def build_cover_letter_prompts(cv_text, job_description):
+    """Build the (system, user) prompts for a standalone cover letter."""
+    system_prompt = load_prompt("cover_letter.txt")
+    cv_text = cv_for_prompt(cv_text, job_description, brief=True)
+    user_prompt = (
+        f"RESUME:\n{cv_text}\n\n"
+        f"JOB DESCRIPTION:\n{job_description}\n\n"
+        "Write the cover letter in JSON format."
+    )
+    return system_prompt, user_prompt
+
+
+def build_gap_analysis_prompts(cv_text, job_description):
+    """Build the (system, user) prompts for a standalone gap analysis."""
+    system_prompt = load_prompt("gap_analysis.txt")
+    cv_text = cv_for_prompt(cv_text, job_description, brief=True)
+    user_prompt = (
+        f"RESUME:\n{cv_text}\n\n"
+        f"JOB DESCRIPTION:\n{job_description}\n\n"
+        "Perform gap analysis in JSON format."
+    )
+    return system_prompt, user_prompt
+
+
+def is_streamed_section(path):
+    """Which closed JSON values are forwarded to the browser while streaming."""
+    if path in (("resume",), ("cover_letter",), ("gap_analysis",), ("resume", "summary")):
+        return True
+    return len(path) == 3 and path[:2] in (("resume", "experience"), ("resume", "skills"))
+
+
+def start_job_queue():
+    queue = JobQueue(workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL)
+    atexit.register(queue.shutdown)
+    return queue
+
+
+job_queue = Lazy(start_job_queue)
+
+
+def run_jobkit_job(job, upload_path, job_description, run_id, use_cache=True,
+                   client_id="anonymous"):
+    """The /generate_jobkit pipeline, run on a job queue worker."""
+    try:
+        job.set_stage("extracting")
+        cv_text = extract_text_from_pdf(str(upload_path))
+        if not cv_text.strip():
+            raise Exception("Could not extract text from PDF. The file may be image-based.")
+
+        job.set_stage("generating")
+        system_prompt, user_prompt = build_jobkit_prompts(cv_text, job_description)
+        llm_response = call_ollama(
+            system_prompt, user_prompt, max_tokens=8192, use_cache=use_cache,
+            client_id=client_id, priority=PRIORITY_BULK,
+        )
+
+        job.set_stage("rendering")
+        return finish_jobkit(llm_response, cv_text, job_description, run_id)
+    finally:
+        remove_upload(upload_path)
+
+
+def client_id(req=request):
+    """
+    Who is asking, for fair LLM scheduling (X-Client-Id header, else the IP).
+    `req` defaults to Flask's request; the ASGI app passes Quart's.
+    """
+    return req.headers.get("X-Client-Id") or req.remote_addr or "anonymous"
+
+
+def llm_cache_allowed(req=request):
+    """Requests can skip the LLM cache with ?no_cache=1 (e.g. to force a fresh generation)."""
+    return req.args.get("no_cache", "").lower() not in ("1", "true", "yes")
+
+
+def sse_event(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# ─────────────────────────────────────────────
+# Catalog Search
+# ─────────────────────────────────────────────
+
+# Inverted indexes (SQLite, loaded on first use): stored job descriptions,
+# searched with a CV, and extracted CVs, searched with a job description
+job_catalog = Lazy(lambda: KeywordIndex(INDEX_FOLDER / "job_catalog.sqlite3"))
+cv_corpus = Lazy(lambda: KeywordIndex(INDEX_FOLDER / "cv_corpus.sqlite3"))
+
+# Their embedding counterparts (memory-mapped IVF, opened on first use), when an
+# embedding model is configured
+job_vectors = cv_vectors = None
+if semantic_matcher is not None and VECTOR_SEARCH_ENABLED:
+    job_vectors = Lazy(lambda: IVFIndex(INDEX_FOLDER / "job_vectors", nprobe=VECTOR_NPROBE))
+    cv_vectors = Lazy(lambda: IVFIndex(INDEX_FOLDER / "cv_vectors", nprobe=VECTOR_NPROBE))
+
+
+def document_embeddings(texts):
+    """One embedding per document, from its first EMBED_DOC_MAX_WORDS words."""
+    return semantic_matcher.embedder.embed(
+        [" ".join(text.split()[:EMBED_DOC_MAX_WORDS]) for text in texts]
+    )
+
+
+def add_document_vectors(vectors, keys, texts):
+    try:
+        vectors.add_many(keys, document_embeddings(texts))
+    except Exception:
+        traceback.print_exc()  # Keyword search works without the vectors
+
+
+def vector_candidates(vectors, query_text, k):
+    """
+    Nearest documents to `query_text` in an IVF index, with the query's
+    embedding, as ({key: similarity}, query vector). Empty when disabled.
+    """
+    if vectors is None or not len(vectors):
+        return {}, None
+    try:
+        query = document_embeddings([query_text])[0]
+        return dict(vectors.search(query, k=k)), query
+    except Exception as e:
+        print(f"[search] vector search skipped: {e}")
+        return {}, None
+
+
+def rank_matches(matches, vectors, query):
+    """
+    Order re-scored matches best first. With a query embedding, each match
+    whose vector is in `vectors` (keyed by match ID) also gets its cosine
+    similarity, blended into the ranking by VECTOR_SEARCH_WEIGHT. Both sides
+    are unit vectors, and the documents' come from the index: nothing is
+    re-embedded per search.
+    """
+    if query is not None and matches:
+        stored = vectors.get([match["id"] for match in matches])
+        for match in matches:
+            if match["id"] in stored:
+                match["similarity"] = round(float(stored[match["id"]] @ query), 3)
+
+    def rank(match):
+        score = match["ats_score"]["score"] / 100
+        if "similarity" not in match:
+            return score
+        return (1 - VECTOR_SEARCH_WEIGHT) * score + VECTOR_SEARCH_WEIGHT * match["similarity"]
+
+    matches.sort(key=rank, reverse=True)
+    return matches
+
+
+def add_catalog_jobs(jobs):
+    """
+    Index job postings ({"description", optional "id", any other fields kept
+    as metadata}). The descriptions join the IDF corpus first, then each is
+    indexed by its ATS top keywords. Returns the job IDs.
+    """
+    keywords = [ats_scorer.keywords(job["description"]) for job in jobs]
+    if jd_idf_index is not None:
+        jd_idf_index.add_many(zip((job["description"] for job in jobs), keywords))
+
+    documents = []
+    for job, counts in zip(jobs, keywords):
+        description = job["description"]
+        job_id = str(job.get("id") or content_key("job", description)[:16])
+        top = ats_scorer.top(description, counts=counts)
+        terms = {word: (count, idf) for word, count, idf in top}
+        norm = sum(count * idf for _, count, idf in top)
+        meta = {k: v for k, v in job.items() if k not in ("id", "description")}
+        documents.append((job_id, description, terms, norm, meta))
+    job_catalog.add_many(documents)
+    if job_vectors is not None:
+        add_document_vectors(job_vectors, [doc[0] for doc in documents], [doc[1] for doc in documents])
+    return [doc[0] for doc in documents]
+
+
+def match_catalog_jobs(cv_text, k=CATALOG_TOP_K):
+    """
+    Rank the catalog for one CV. The index returns the top `k` by ATS
+    coverage, and vector search the `k` most similar by embedding; the union
+    is re-scored exactly (current IDF weights) for the score and
+    matched/missing keywords, and the best `k` are returned.
+    """
+    cv_counts = ats_scorer.cv_keywords(cv_text)
+    hits = job_catalog.search({term: (count, 1.0) for term, count in cv_counts.items()}, k=k)
+    similar, query = vector_candidates(job_vectors, cv_text, k)
+    keys = list(dict.fromkeys([key for key, _ in hits] + list(similar)))
+    jobs = job_catalog.get(keys)  # Skips jobs removed since the search
+    scores = ats_scorer.score_jobs(cv_text, [job["text"] for job in jobs])
+
+    matches = [
+        {"id": job["key"], **job["meta"], "ats_score": ats}
+        for job, ats in zip(jobs, scores)
+    ]
+    return rank_matches(matches, job_vectors, query)[:k]
+
+
+# Orders CV adds against phrase backfills, so no CV misses a phrase
+cv_corpus_lock = threading.Lock()
+
+
+def add_corpus_cv(cv_sha256, cv_text, meta=None):
+    """
+    Index an extracted CV (keyed by its PDF hash) with its keyword counts.
+    Of its n-grams only the phrases searches have already asked for are
+    kept (see complete_corpus_phrases); indexing every CV bigram and
+    trigram bloats the index without ever matching.
+    """
+    with cv_corpus_lock:
+        counts = ats_scorer.cv_keywords(cv_text, ngram_vocab=cv_corpus.complete_terms())
+        terms = {term: (count, 1.0) for term, count in counts.items()}
+        cv_corpus.add(cv_sha256, cv_text, terms, meta=meta)
+    if cv_vectors is not None:
+        # Embedding is a model call: keep it off the upload's request path
+        pipeline_executor.submit(add_document_vectors, cv_vectors, [cv_sha256], [cv_text])
+
+
+def complete_corpus_phrases(keywords):
+    """
+    Backfill the n-grams among `keywords` that the CV corpus has not indexed
+    yet, so their postings cover every stored CV. A CV can only contain a
+    phrase if it has all of the phrase's words, which are always indexed, so
+    only those CVs are re-counted; each phrase is backfilled once.
+    """
+    with cv_corpus_lock:
+        complete = cv_corpus.complete_terms()
+        phrases = {w for w in keywords if ats_scorer.is_ngram(w) and w not in complete}
+        if not phrases:
+            return
+        candidates = {phrase: cv_corpus.keys_with_all(phrase.split()) for phrase in phrases}
+        keys = list(dict.fromkeys(key for found in candidates.values() for key in found))
+        postings = {phrase: {} for phrase in phrases}
+        for cv in cv_corpus.get(keys):
+            counts = ats_scorer.cv_keywords(cv["text"], ngram_vocab=phrases)
+            for phrase in phrases:
+                if counts.get(phrase):
+                    postings[phrase][cv["key"]] = (counts[phrase], 1.0)
+        for phrase in phrases:
+            cv_corpus.add_postings(phrase, postings[phrase])
+
+
+def search_corpus_cvs(job_description, k=CATALOG_TOP_K):
+    """
+    Rank the stored CVs for one job description. The query carries the
+    JD's top keywords with their IDF weights, and every one of them is fully
+    indexed, so the index score is each CV's exact ATS coverage ratio.
+    Vector search adds the `k` most similar CVs by embedding; all are
+    re-scored for matched/missing keywords and the best `k` returned.
+    """
+    top = ats_scorer.top(job_description)
+    if not top:
+        return []
+    complete_corpus_phrases([word for word, _, _ in top])
+    terms = {word: (count, idf) for word, count, idf in top}
+    hits = cv_corpus.search(terms, k=k, norm=sum(count * idf for _, count, idf in top))
+    similar, query = vector_candidates(cv_vectors, job_description, k)
+    cvs = cv_corpus.get(list(dict.fromkeys([key for key, _ in hits] + list(similar))))
+    scores = ats_scorer.score_cvs([cv["text"] for cv in cvs], job_description)
+
+    matches = [
+        {"id": cv["key"], **cv["meta"], "ats_score": ats}
+        for cv, ats in zip(cvs, scores)
+    ]
+    return rank_matches(matches, cv_vectors, query)[:k]
+
+
+# ─────────────────────────────────────────────
+# Response Bodies (shared with asgi_app.py)
+# ─────────────────────────────────────────────
+
+def check_catalog_jobs(data):
+    """Validate a /catalog/jobs body. Returns (jobs, None) or (None, error message)."""
+    jobs = (data or {}).get("jobs") if isinstance(data, dict) else None
+    if not isinstance(jobs, list) or not jobs:
+        return None, "Body must be {\"jobs\": [...]}"
+    for job in jobs:
+        if not isinstance(job, dict) or not str(job.get("description", "")).strip():
+            return None, "Every job needs a non-empty description"
+    return jobs, None
+
+
+def preflight_analysis(upload_path, job_description):
+    """The /preflight body for a saved upload, or None if it has no text."""
+    started = time.time()
+    extraction = extract_pdf_cached(str(upload_path))
+    cv_text = extraction["text"]
+    if not cv_text.strip():
+        return None
+    extracted = time.time()
+    ats_analysis = score_ats(cv_text, job_description)
+    return {
+        "success": True,
+        "cv_text": cv_text,
+        "cv_sha256": extraction["sha256"],
+        "pages": len(extraction["pages"]),
+        "cv_structure": extraction["structure"],
+        "ats_score": ats_analysis,
+        "timing_ms": {
+            "extraction": round((extracted - started) * 1000),
+            "ats": round((time.time() - extracted) * 1000),
+        },
+    }
+
+
+def match_catalog_upload(upload_path, k):
+    """The /catalog/match body for a saved upload, or None if it has no text."""
+    started = time.time()
+    extraction = extract_pdf_cached(str(upload_path))
+    if not extraction["text"].strip():
+        return None
+    extracted = time.time()
+    matches = match_catalog_jobs(extraction["text"], k=k)
+    return {
+        "success": True,
+        "cv_sha256": extraction["sha256"],
+        "catalog_size": len(job_catalog),
+        "matches": matches,
+        "timing_ms": {
+            "extraction": round((extracted - started) * 1000),
+            "search": round((time.time() - extracted) * 1000),
+        },
+    }
+
+
+def index_corpus_upload(upload_path, filename):
+    """Extract a saved upload and add it to the CV corpus. Its hash, or None if it has no text."""
+    extraction = extract_pdf_cached(str(upload_path))
+    if not extraction["text"].strip():
+        return None
+    add_corpus_cv(extraction["sha256"], extraction["text"], {"filename": filename})
+    return extraction["sha256"]
+
+
+def cache_summary():
+    return {
+        "llm": {"enabled": True, **llm_cache.stats()} if llm_cache is not None else {"enabled": False},
+        "pdf_text": pdf_text_cache.stats(),
+    }
+
+
+def catalog_summary():
+    return {
+        "jobs": job_catalog.stats(),
+        "cvs": cv_corpus.stats(),
+        "job_vectors": job_vectors.stats() if job_vectors is not None else None,
+        "cv_vectors": cv_vectors.stats() if cv_vectors is not None else None,
+    }
+
+
+def ats_summary():
+    with ats_history_lock:
+        entries = list(ats_history)
+    by_model = {}
+    for entry in entries:
+        by_model.setdefault(entry["model"], []).append(entry)
+
+    def summarize(items):
+        if not items:
+            return {"generations": 0}
+        return {
+            "generations": len(items),
+            "avg_before": round(sum(e["before"] for e in items) / len(items), 1),
+            "avg_after": round(sum(e["after"] for e in items) / len(items), 1),
+            "avg_uplift": round(sum(e["uplift"] for e in items) / len(items), 1),
+            "improved": sum(1 for e in items if e["uplift"] > 0),
+        }
+
+    return {
+        **summarize(entries),
+        "by_model": {model: summarize(items) for model, items in by_model.items()},
+        "idf": jd_idf_index.stats() if jd_idf_index is not None else None,
+    }
 
 
 # ─────────────────────────────────────────────
@@ -381,28 +1445,15 @@ def index():
 def generate():
     """Handle PDF upload + job description, generate tailored resume."""
 
-    # Validate inputs
-    if "pdf" not in request.files:
-        return jsonify({"error": "No PDF file uploaded"}), 400
-
-    pdf_file = request.files["pdf"]
-    job_description = request.form.get("job_description", "").strip()
-
-    if pdf_file.filename == "":
-        return jsonify({"error": "No file selected"}), 400
-
-    if not pdf_file.filename.lower().endswith(".pdf"):
-        return jsonify({"error": "File must be a PDF"}), 400
-
-    if not job_description:
-        return jsonify({"error": "Job description is required"}), 400
+    pdf_file, job_description, error = read_upload_form()
+    if error:
+        return error
 
+    upload_path = None
     try:
         # 1. Save uploaded PDF
-        timestamp = int(time.time())
-        safe_name = re.sub(r"[^a-zA-Z0-9_.-]", "_", pdf_file.filename)
-        upload_path = UPLOAD_FOLDER / f"{timestamp}_{safe_name}"
-        pdf_file.save(str(upload_path))
+        run_id = uuid.uuid4().hex
+        upload_path = save_upload(pdf_file, run_id)
 
         # 2. Extract text
         cv_text = extract_text_from_pdf(str(upload_path))
@@ -410,135 +1461,277 @@ def generate():
             return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
 
         # 3. Build prompt
-        system_prompt = load_system_prompt()
-        user_prompt = (
-            f"Here is the candidate's current resume:\n\n"
-            f"---\n{cv_text}\n---\n\n"
-            f"Here is the target job description:\n\n"
-            f"---\n{job_description}\n---\n\n"
-            f"Analyze the job description, map the candidate's experience to the requirements, "
-            f"and produce the tailored resume as a JSON object. "
-            f"Remember: only output valid JSON, nothing else."
-        )
-
-        # 4. Call LLM
-        llm_response = call_ollama(system_prompt, user_prompt)
-
-        # 5. Parse response
-        resume_data = parse_llm_response(llm_response)
-
-        # 5b. Normalize data to match template expectations
-        resume_data = normalize_resume_data(resume_data)
-
-        # 6. Generate PDF
-        output_name = f"tailored_cv_{timestamp}"
-        pdf_path = generate_pdf_from_data(resume_data, output_name)
-
-        # 7. Compute ATS Score (pure Python, fast)
-        ats_analysis = compute_ats_score(cv_text, job_description)
+        system_prompt, user_prompt = build_resume_prompts(cv_text, job_description)
+        use_cache, user = llm_cache_allowed(), client_id()
+
+        def generate_resume():
+            # 4-5. Call LLM and parse its response
+            llm_response = call_ollama(
+                system_prompt, user_prompt, use_cache=use_cache,
+                client_id=user, priority=PRIORITY_RESUME,
+            )
+            return parse_llm_response(llm_response)
 
-        # 8. Clean up upload
-        try:
-            os.remove(str(upload_path))
-        except OSError:
-            pass
+        # 6. Normalize, render PDF + preview, score and clean up side by side
+        output_name = f"tailored_cv_{run_id}"
+        pipeline_upload, upload_path = upload_path, None  # The pipeline cleans it up
+        resume_data, _, _, ats_analysis, (ats_tailored, ats_uplift) = run_tailoring_pipeline(
+            generate_resume, cv_text, job_description, pipeline_upload, output_name,
+        )
 
         return jsonify({
             "success": True,
             "download_url": f"/download/{output_name}.pdf",
+            "preview_url": f"/preview/{output_name}.html",
             "resume_data": resume_data,
             "ats_score": ats_analysis,
+            "ats_tailored": ats_tailored,
+            "ats_uplift": ats_uplift,
             "cv_text": cv_text,  # Send back for next steps
         })
 
     except Exception as e:
         traceback.print_exc()  # Log full traceback to terminal
         return jsonify({"error": str(e)}), 500
+    finally:
+        if upload_path is not None:
+            remove_upload(upload_path)
 
 
 @app.route("/generate_jobkit", methods=["POST"])
 def generate_jobkit():
-    """Unified endpoint: Generate CV + Cover Letter + Gap Analysis in ONE LLM call."""
-
-    # Validate inputs
-    if "pdf" not in request.files:
-        return jsonify({"error": "No PDF file uploaded"}), 400
-
-    pdf_file = request.files["pdf"]
-    job_description = request.form.get("job_description", "").strip()
-
-    if pdf_file.filename == "":
-        return jsonify({"error": "No file selected"}), 400
-
-    if not pdf_file.filename.lower().endswith(".pdf"):
-        return jsonify({"error": "File must be a PDF"}), 400
+    """
+    Unified endpoint: Generate CV + Cover Letter + Gap Analysis in ONE LLM call.
+    With ?mode=parallel the three are generated as concurrent calls instead.
+    """
 
-    if not job_description:
-        return jsonify({"error": "Job description is required"}), 400
+    pdf_file, job_description, error = read_upload_form()
+    if error:
+        return error
 
+    upload_path = None
     try:
         # 1. Save uploaded PDF
-        timestamp = int(time.time())
-        safe_name = re.sub(r"[^a-zA-Z0-9_.-]", "_", pdf_file.filename)
-        upload_path = UPLOAD_FOLDER / f"{timestamp}_{safe_name}"
-        pdf_file.save(str(upload_path))
+        run_id = uuid.uuid4().hex
+        upload_path = save_upload(pdf_file, run_id)
 
         # 2. Extract text
         cv_text = extract_text_from_pdf(str(upload_path))
         if not cv_text.strip():
             return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
 
-        # 3. Build UNIFIED prompt (one call for everything)
-        system_prompt = load_prompt("unified_jobkit.txt")
-        user_prompt = (
-            f"Here is the candidate's current resume:\n\n"
-            f"---\n{cv_text}\n---\n\n"
-            f"Here is the target job description:\n\n"
-            f"---\n{job_description}\n---\n\n"
-            f"Generate the complete Job Kit: tailored resume, cover letter, and gap analysis. "
-            f"Output ONLY the JSON object with keys: resume, cover_letter, gap_analysis."
+        use_cache, user = llm_cache_allowed(), client_id()
+        if request.args.get("mode") == "parallel":
+            # 3-4. Three concurrent calls, joined into the unified shape
+            def generate_kit():
+                return generate_jobkit_fanout(
+                    cv_text, job_description, use_cache=use_cache, client_id=user,
+                )
+        else:
+            # 3. Build UNIFIED prompt (one call for everything)
+            system_prompt, user_prompt = build_jobkit_prompts(cv_text, job_description)
+
+            def generate_kit():
+                # 4. Call LLM with higher token limit for the combined output
+                llm_response = call_ollama(
+                    system_prompt, user_prompt, max_tokens=8192, use_cache=use_cache,
+                    client_id=user, priority=PRIORITY_BULK,
+                )
+                return parse_llm_response(llm_response)
+
+        # 5. Parse, render PDF + preview, score and clean up side by side
+        output_name = f"tailored_cv_{run_id}"
+        pipeline_upload, upload_path = upload_path, None  # The pipeline cleans it up
+        (resume_data, cover_letter_data, gap_analysis_data,
+         ats_analysis, tailored_score) = run_tailoring_pipeline(
+            generate_kit, cv_text, job_description, pipeline_upload, output_name,
         )
 
-        # 4. Call LLM with higher token limit for the combined output
-        llm_response = call_ollama(system_prompt, user_prompt, max_tokens=8192)
+        body = jobkit_response(
+            output_name, resume_data, cv_text, job_description,
+            cover_letter_data, gap_analysis_data,
+            ats_analysis=ats_analysis, tailored_score=tailored_score,
+        )
+        body["preview_url"] = f"/preview/{output_name}.html"
+        return jsonify(body)
 
-        # 5. Parse the unified response
-        full_data = parse_llm_response(llm_response)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if upload_path is not None:
+            remove_upload(upload_path)
 
-        # 6. Extract and normalize each section
-        resume_data = full_data.get("resume", full_data)  # Fallback: if flat, treat whole thing as resume
-        cover_letter_data = full_data.get("cover_letter", {})
-        gap_analysis_data = full_data.get("gap_analysis", {})
 
-        # Normalize resume data for template
-        resume_data = normalize_resume_data(resume_data)
+@app.route("/generate_jobkit_stream", methods=["POST"])
+def generate_jobkit_stream():
+    """
+    Same as /generate_jobkit, but streams progress to the browser as
+    server-sent events while the model generates:
+      ats      -> ATS analysis of the uploaded CV, sent before generation starts
+      stage    -> {"stage": "generating" | "rendering"}
+      progress -> {"tokens", "tokens_per_sec", "chars"}
+      section  -> {"path", "value"} as each resume section / entry closes
+      result   -> the /generate_jobkit response body
+      error    -> {"error"}
+    The PDF render starts as soon as the "resume" object has streamed in,
+    overlapping with generation of the cover letter and gap analysis.
+    Disconnecting cancels the generation.
+    """
+    pdf_file, job_description, error = read_upload_form()
+    if error:
+        return error
 
-        # 7. Generate PDF
-        output_name = f"tailored_cv_{timestamp}"
-        pdf_path = generate_pdf_from_data(resume_data, output_name)
+    run_id = uuid.uuid4().hex
+    upload_path = save_upload(pdf_file, run_id)
+    try:
+        cv_text = extract_text_from_pdf(str(upload_path))
+    except Exception as e:
+        traceback.print_exc()
+        remove_upload(upload_path)
+        return jsonify({"error": str(e)}), 500
+    if not cv_text.strip():
+        remove_upload(upload_path)
+        return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
 
-        # 8. Compute ATS Score (pure Python, instant)
-        ats_analysis = compute_ats_score(cv_text, job_description)
+    system_prompt, user_prompt = build_jobkit_prompts(cv_text, job_description)
+    use_cache = llm_cache_allowed()
+    requester = client_id()
 
-        # 9. Clean up upload
+    def events():
         try:
-            os.remove(str(upload_path))
-        except OSError:
-            pass
+            # Keyword score first (pure Python, instant); the semantic pass
+            # follows as a second "ats" event if it finishes during generation
+            ats_analysis, semantic_future = start_ats(cv_text, job_description)
+            yield sse_event("ats", ats_analysis)
+            yield sse_event("stage", {"stage": "generating"})
+            parts = []
+            chars = 0
+            last_sent = 0.0
+            parser = IncrementalJSONParser()
+            pdf_future = None
+            chunks = stream_ollama(
+                system_prompt, user_prompt, max_tokens=8192, use_cache=use_cache,
+                client_id=requester, priority=PRIORITY_BULK,
+            )
+            for chunk in chunks:
+                parts.append(chunk["text"])
+                chars += len(chunk["text"])
+                if semantic_future is not None and semantic_future.done():
+                    if "semantic" in with_semantic(ats_analysis, semantic_future, 0):
+                        yield sse_event("ats", ats_analysis)
+                    semantic_future = None
+
+                for path, value in parser.feed(chunk["text"]):
+                    if not is_streamed_section(path):
+                        continue
+                    yield sse_event("section", {"path": list(path), "value": value})
+                    if path == ("resume",):
+                        early_resume = normalize_resume_data(value)
+                        pdf_future = render_executor.submit(
+                            generate_pdf_from_data, early_resume, f"tailored_cv_{run_id}"
+                        )
+
+                now = time.time()
+                # Throttle progress events to a few per second
+                if chunk["done"] or now - last_sent >= SSE_PROGRESS_INTERVAL:
+                    last_sent = now
+                    yield sse_event("progress", {
+                        "tokens": chunk["tokens"],
+                        "tokens_per_sec": chunk["tokens_per_sec"],
+                        "chars": chars,
+                    })
+
+            yield sse_event("stage", {"stage": "rendering"})
+            with_semantic(ats_analysis, semantic_future)
+            result = finish_jobkit(
+                "".join(parts), cv_text, job_description, run_id,
+                full_data=parser.root, pdf_future=pdf_future, ats_analysis=ats_analysis,
+            )
+            yield sse_event("result", result)
+        except Exception as e:
+            traceback.print_exc()
+            yield sse_event("error", {"error": str(e)})
+        finally:
+            # Also runs when the client disconnects mid-stream
+            remove_upload(upload_path)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        return jsonify({
-            "success": True,
-            "download_url": f"/download/{output_name}.pdf",
-            "resume_data": resume_data,
-            "ats_score": ats_analysis,
-            "cv_text": cv_text,
-            "cover_letter": cover_letter_data,
-            "gap_analysis": gap_analysis_data,
-        })
+
+@app.route("/preflight", methods=["POST"])
+def preflight():
+    """
+    Fast first look at an upload: extracted text and the ATS analysis of the
+    CV as it is, with no LLM call. With ?start=jobkit a full Job Kit is also
+    queued in the background; poll the returned status_url for it.
+    """
+    pdf_file, job_description, error = read_upload_form()
+    if error:
+        return error
+
+    run_id = uuid.uuid4().hex
+    upload_path = save_upload(pdf_file, run_id)
+    queued = False
+    try:
+        body = preflight_analysis(upload_path, job_description)
+        if body is None:
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+
+        if request.args.get("start") == "jobkit":
+            # The job re-reads the upload (a text cache hit) and removes it when done
+            job = job_queue.submit(
+                "jobkit", run_jobkit_job, upload_path, job_description, run_id,
+                use_cache=llm_cache_allowed(), client_id=client_id(),
+            )
+            queued = True
+            body["job_id"] = job.id
+            body["status_url"] = f"/jobs/{job.id}"
+        return jsonify(body)
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
+    finally:
+        if not queued:
+            remove_upload(upload_path)
+
+
+@app.route("/jobs/jobkit", methods=["POST"])
+def submit_jobkit_job():
+    """
+    Queue a Job Kit generation and return immediately with a job ID.
+    Poll GET /jobs/<job_id> for its stage and, once done, the result
+    (same body as /generate_jobkit).
+    """
+    pdf_file, job_description, error = read_upload_form()
+    if error:
+        return error
+
+    run_id = uuid.uuid4().hex
+    upload_path = save_upload(pdf_file, run_id)
+    job = job_queue.submit(
+        "jobkit", run_jobkit_job, upload_path, job_description, run_id,
+        use_cache=llm_cache_allowed(), client_id=client_id(),
+    )
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+    }), 202
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Status of a queued job; includes the result once it is done."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
 
 
 @app.route("/generate_cover_letter", methods=["POST"])
@@ -552,14 +1745,11 @@ def generate_cover_letter():
         return jsonify({"error": "Missing CV text or Job Description"}), 400
         
     try:
-        system_prompt = load_prompt("cover_letter.txt")
-        user_prompt = (
-            f"RESUME:\n{cv_text[:3000]}\n\n"
-            f"JOB DESCRIPTION:\n{job_description}\n\n"
-            "Write the cover letter in JSON format."
+        system_prompt, user_prompt = build_cover_letter_prompts(cv_text, job_description)
+        response = call_ollama(
+            system_prompt, user_prompt, use_cache=llm_cache_allowed(),
+            client_id=client_id(), priority=PRIORITY_INTERACTIVE,
         )
-        
-        response = call_ollama(system_prompt, user_prompt)
         parsed = parse_llm_response(response)
         return jsonify(parsed)
     except Exception as e:
@@ -578,14 +1768,11 @@ def generate_gap_analysis():
         return jsonify({"error": "Missing CV text or Job Description"}), 400
         
     try:
-        system_prompt = load_prompt("gap_analysis.txt")
-        user_prompt = (
-            f"RESUME:\n{cv_text[:3000]}\n\n"
-            f"JOB DESCRIPTION:\n{job_description}\n\n"
-            "Perform gap analysis in JSON format."
+        system_prompt, user_prompt = build_gap_analysis_prompts(cv_text, job_description)
+        response = call_ollama(
+            system_prompt, user_prompt, use_cache=llm_cache_allowed(),
+            client_id=client_id(), priority=PRIORITY_INTERACTIVE,
         )
-        
-        response = call_ollama(system_prompt, user_prompt)
         parsed = parse_llm_response(response)
         return jsonify(parsed)
     except Exception as e:
@@ -593,6 +1780,149 @@ def generate_gap_analysis():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/render_pdf", methods=["POST"])
+def render_pdf():
+    """Render resume JSON to a PDF and stream it back without saving a copy."""
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"error": "Missing resume data"}), 400
+
+    try:
+        resume_data = normalize_resume_data(data.get("resume_data", data))
+        pdf_bytes = render_pdf_bytes(resume_data)
+        return send_file(
+            io.BytesIO(pdf_bytes),
+            as_attachment=True,
+            download_name="tailored_cv.pdf",
+            mimetype="application/pdf",
+        )
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/stats/cache")
+def cache_stats():
+    """Hit/miss counters and sizes of the LLM response and PDF text caches."""
+    return jsonify(cache_summary())
+
+
+@app.route("/catalog/jobs", methods=["POST"])
+def catalog_add_jobs():
+    """
+    Add job postings to the catalog. JSON body:
+    {"jobs": [{"description": "...", "id": "...", "title": "...", ...}]}
+    Re-adding an existing id replaces that job.
+    """
+    jobs, message = check_catalog_jobs(request.get_json(silent=True))
+    if message:
+        return jsonify({"error": message}), 400
+
+    try:
+        ids = add_catalog_jobs(jobs)
+        return jsonify({"success": True, "added": len(ids), "ids": ids, "total": len(job_catalog)})
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/catalog/match", methods=["POST"])
+def catalog_match():
+    """Upload a CV (form field "pdf") and get the best-matching catalog jobs. ?k= sets how many."""
+    pdf_file, _, error = read_upload_form(require_job_description=False)
+    if error:
+        return error
+    k = min(max(request.args.get("k", CATALOG_TOP_K, type=int), 1), CATALOG_MAX_TOP_K)
+
+    run_id = uuid.uuid4().hex
+    upload_path = save_upload(pdf_file, run_id)
+    try:
+        body = match_catalog_upload(upload_path, k)
+        if body is None:
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+        return jsonify(body)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        remove_upload(upload_path)
+
+
+@app.route("/corpus/cvs", methods=["POST"])
+def corpus_add_cvs():
+    """Extract and index one or more CVs (form field "pdf", repeatable) for reverse search."""
+    pdf_files = [f for f in request.files.getlist("pdf") if f.filename]
+    if not pdf_files:
+        return jsonify({"error": "No PDF file uploaded"}), 400
+    if any(not f.filename.lower().endswith(".pdf") for f in pdf_files):
+        return jsonify({"error": "File must be a PDF"}), 400
+
+    run_id = uuid.uuid4().hex
+    added, skipped = [], []
+    for pdf_file in pdf_files:
+        upload_path = save_upload(pdf_file, run_id)
+        try:
+            sha = index_corpus_upload(upload_path, pdf_file.filename)
+            if sha is None:
+                skipped.append(pdf_file.filename)
+                continue
+            added.append(sha)
+        except Exception:
+            traceback.print_exc()
+            skipped.append(pdf_file.filename)
+        finally:
+            remove_upload(upload_path)
+
+    return jsonify({"success": True, "added": added, "skipped": skipped, "total": len(cv_corpus)})
+
+
+@app.route("/corpus/search", methods=["POST"])
+def corpus_search():
+    """
+    Rank stored CVs against a job description (form or JSON field
+    "job_description"). ?k= sets how many are returned.
+    """
+    data = request.get_json(silent=True) or request.form
+    job_description = str(data.get("job_description", "")).strip()
+    if not job_description:
+        return jsonify({"error": "Job description is required"}), 400
+    k = min(max(request.args.get("k", CATALOG_TOP_K, type=int), 1), CATALOG_MAX_TOP_K)
+
+    try:
+        started = time.time()
+        matches = search_corpus_cvs(job_description, k=k)
+        return jsonify({
+            "success": True,
+            "corpus_size": len(cv_corpus),
+            "matches": matches,
+            "timing_ms": {"search": round((time.time() - started) * 1000)},
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/stats/catalog")
+def catalog_stats():
+    """Size of the job catalog and CV corpus indexes."""
+    return jsonify(catalog_summary())
+
+
+@app.route("/stats/ats")
+def ats_stats():
+    """
+    Average ATS score before and after tailoring over recent generations,
+    per model, and the size of the IDF corpus.
+    """
+    return jsonify(ats_summary())
+
+
+@app.route("/stats/llm")
+def llm_stats():
+    """LLM scheduler queue depth, in-flight generations and wait times."""
+    return jsonify({**llm_scheduler.stats(), "jobs": job_queue.stats()})
+
+
 @app.route("/download/<filename>")
 def download(filename):
     """Serve a generated PDF."""
@@ -607,6 +1937,15 @@ def download(filename):
     )
 
 
+@app.route("/preview/<filename>")
+def preview(filename):
+    """Serve the HTML preview of a generated CV."""
+    file_path = OUTPUT_FOLDER / filename
+    if file_path.suffix != ".html" or not file_path.exists():
+        return jsonify({"error": "File not found"}), 404
+    return send_file(str(file_path), mimetype="text/html")
+
+
 # ─────────────────────────────────────────────
 # Entry
 # ─────────────────────────────────────────────
@@ -0,0 +1,712 @@
+"""
+Async-native variant of the CV Builder app, for an ASGI server.
+
+Same routes and responses as app.py, but every slow step is awaited instead
+of holding an OS thread: the Ollama calls go through AsyncOllamaClient, the
+LLM scheduler is waited on asynchronously, PDF renders are awaited on the
+shared browser pool, and blocking work (SQLite caches and indexes,
+pdfplumber, template rendering, ATS scoring) is pushed to worker threads.
+One process can keep many long generations in flight at once.
+
+Routes whose work is all blocking (catalog and corpus search, /preflight)
+run app.py's own helpers on a worker thread; queued jobs still run on
+app.py's job queue.
+
+Run with:  hypercorn asgi_app:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import io
+import time
+import traceback
+import uuid
+
+from quart import Quart, Response, render_template, request, jsonify, send_file
+
+import app as core
+from json_stream import IncrementalJSONParser
+from ollama_client import AsyncOllamaClient
+from llm_scheduler import PRIORITY_INTERACTIVE, PRIORITY_RESUME, PRIORITY_BULK
+
+app = Quart(__name__)
+app.config["MAX_CONTENT_LENGTH"] = core.app.config["MAX_CONTENT_LENGTH"]
+
+ollama = None
+
+
+@app.before_serving
+async def _startup():
+    global ollama
+    ollama = AsyncOllamaClient(
+        core.OLLAMA_URL,
+        pool_size=core.OLLAMA_POOL_SIZE,
+        connect_timeout=core.OLLAMA_CONNECT_TIMEOUT,
+        read_timeout=core.OLLAMA_READ_TIMEOUT,
+        retries=core.OLLAMA_RETRIES,
+        backoff=core.OLLAMA_RETRY_BACKOFF,
+    )
+
+
+@app.after_serving
+async def _shutdown():
+    await ollama.aclose()
+
+
+# ─────────────────────────────────────────────
+# Async LLM Integration
+# ─────────────────────────────────────────────
+
+def _ollama_error(e):
+    """Map client errors to the same messages as app.call_ollama."""
+    import httpx
+
+    if isinstance(e, httpx.ConnectError):
+        return Exception(
+            "Cannot connect to Ollama. Make sure Ollama is running "
+            "(run 'ollama serve' in a terminal)."
+        )
+    if isinstance(e, httpx.TimeoutException):
+        return Exception(
+            "Ollama request timed out. The model may be too slow for this task. "
+            "Try a smaller input or a faster model."
+        )
+    return Exception(f"Ollama error: {str(e)}")
+
+
+async def call_ollama_async(system_prompt, user_prompt, max_tokens=4096, use_cache=True,
+                            client_id="anonymous", priority=PRIORITY_RESUME):
+    """Async counterpart of app.call_ollama (same cache and scheduler)."""
+    payload = core.build_ollama_payload(system_prompt, user_prompt, max_tokens)
+    key = core.llm_cache_key(payload)
+    if use_cache and core.llm_cache is not None:
+        cached = await asyncio.to_thread(core.llm_cache.get, key)
+        if cached is not None:
+            return cached
+
+    try:
+        async with core.llm_scheduler.async_slot(
+            client_id, priority, timeout=core.LLM_QUEUE_TIMEOUT
+        ):
+            result = await ollama.generate(payload)
+        text = result.get("response", "")
+    except Exception as e:
+        raise _ollama_error(e)
+
+    await asyncio.to_thread(core.store_llm_response, key, text)
+    return text
+
+
+async def stream_ollama_async(system_prompt, user_prompt, max_tokens=4096, use_cache=True,
+                              client_id="anonymous", priority=PRIORITY_RESUME):
+    """Async counterpart of app.stream_ollama; yields the same chunk dicts."""
+    payload = core.build_ollama_payload(system_prompt, user_prompt, max_tokens, stream=True)
+    key = core.llm_cache_key(payload)
+    if use_cache and core.llm_cache is not None:
+        cached = await asyncio.to_thread(core.llm_cache.get, key)
+        if cached is not None:
+            yield {"text": cached, "tokens": 0, "tokens_per_sec": 0.0, "done": True}
+            return
+
+    started = time.time()
+    tokens = 0
+    parts = []
+    finished = False
+
+    try:
+        async with core.llm_scheduler.async_slot(
+            client_id, priority, timeout=core.LLM_QUEUE_TIMEOUT
+        ):
+            async for chunk in ollama.stream(payload):
+                if chunk.get("error"):
+                    raise Exception(chunk["error"])
+                tokens += 1
+                if chunk.get("done"):
+                    tokens = chunk.get("eval_count", tokens)
+                    finished = True
+                parts.append(chunk.get("response", ""))
+                elapsed = time.time() - started
+                yield {
+                    "text": chunk.get("response", ""),
+                    "tokens": tokens,
+                    "tokens_per_sec": round(tokens / elapsed, 1) if elapsed > 0 else 0.0,
+                    "done": bool(chunk.get("done")),
+                }
+    except Exception as e:
+        raise _ollama_error(e)
+
+    if finished:
+        await asyncio.to_thread(core.store_llm_response, key, "".join(parts))
+
+
+# ─────────────────────────────────────────────
+# Async Pipeline Helpers
+# ─────────────────────────────────────────────
+
+async def build_prompts_async(build_prompts, cv_text, job_description):
+    """Run a core.build_*_prompts off the loop (prompt files, CV structure cache, IDF)."""
+    return await asyncio.to_thread(build_prompts, cv_text, job_description)
+
+
+async def generate_jobkit_fanout_async(cv_text, job_description, use_cache, requester):
+    """asyncio version of core.generate_jobkit_fanout(): the three calls are gathered."""
+    names = ("resume", "cover_letter", "gap_analysis")
+    prompts = await asyncio.gather(*(
+        build_prompts_async(build, cv_text, job_description)
+        for build in (
+            core.build_resume_prompts,
+            core.build_cover_letter_prompts,
+            core.build_gap_analysis_prompts,
+        )
+    ))
+    responses = await asyncio.gather(*(
+        call_ollama_async(
+            system_prompt, user_prompt, use_cache=use_cache,
+            client_id=requester, priority=PRIORITY_BULK,
+        )
+        for system_prompt, user_prompt in prompts
+    ))
+    return {
+        name: core.parse_llm_response(response)
+        for name, response in zip(names, responses)
+    }
+
+
+async def run_tailoring_pipeline_async(generation, cv_text, job_description, upload_path,
+                                       output_name):
+    """
+    Await the LLM output (`generation`, a coroutine), then run
+    core.run_tailoring_pipeline on a worker thread for the rest (parse,
+    render, score, clean up). Same return value.
+    """
+    try:
+        data = await generation
+    except BaseException:
+        core.remove_upload(upload_path)
+        raise
+    return await asyncio.to_thread(
+        core.run_tailoring_pipeline,
+        lambda: data, cv_text, job_description, upload_path, output_name,
+    )
+
+
+async def generate_pdf_async(resume_data, output_filename):
+    """Render on the shared browser pool without blocking the loop, then save."""
+    html_content = await asyncio.to_thread(core.render_cv_html, resume_data)
+    pdf_bytes = await core.browser_pool.run_async(
+        core.pdf_render_fn(html_content, output_filename),
+        timeout=core.PDF_RENDER_TIMEOUT,
+    )
+    pdf_path = str(core.OUTPUT_FOLDER / f"{output_filename}.pdf")
+    await asyncio.to_thread(_write_bytes, pdf_path, pdf_bytes)
+    return pdf_path
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def read_upload_form(require_job_description=True):
+    """Quart counterpart of app.read_upload_form (same checks, via core.check_upload_form)."""
+    pdf_file, job_description, message = core.check_upload_form(
+        await request.files, await request.form, require_job_description
+    )
+    if message:
+        return None, None, (jsonify({"error": message}), 400)
+    return pdf_file, job_description, None
+
+
+async def save_upload(pdf_file, run_id):
+    """Save the upload to the uploads folder and return its path."""
+    upload_path = core.upload_path_for(pdf_file.filename, run_id)
+    await pdf_file.save(str(upload_path))
+    return upload_path
+
+
+async def save_and_extract(pdf_file, run_id):
+    """Save the upload and extract its text off the event loop. Returns (path, text)."""
+    upload_path = await save_upload(pdf_file, run_id)
+    try:
+        cv_text = await asyncio.to_thread(core.extract_text_from_pdf, str(upload_path))
+    except Exception:
+        core.remove_upload(upload_path)
+        raise
+    return upload_path, cv_text
+
+
+def top_k():
+    return min(max(request.args.get("k", core.CATALOG_TOP_K, type=int), 1), core.CATALOG_MAX_TOP_K)
+
+
+# ─────────────────────────────────────────────
+# Routes
+# ─────────────────────────────────────────────
+
+@app.route("/")
+async def index():
+    """Serve the upload page."""
+    return await render_template("index.html")
+
+
+@app.route("/generate", methods=["POST"])
+async def generate():
+    """Handle PDF upload + job description, generate tailored resume."""
+    pdf_file, job_description, error = await read_upload_form()
+    if error:
+        return error
+
+    upload_path = None
+    try:
+        run_id = uuid.uuid4().hex
+        upload_path, cv_text = await save_and_extract(pdf_file, run_id)
+        if not cv_text.strip():
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+
+        system_prompt, user_prompt = await build_prompts_async(
+            core.build_resume_prompts, cv_text, job_description
+        )
+
+        async def generate_resume():
+            llm_response = await call_ollama_async(
+                system_prompt, user_prompt, use_cache=core.llm_cache_allowed(request),
+                client_id=core.client_id(request), priority=PRIORITY_RESUME,
+            )
+            return core.parse_llm_response(llm_response)
+
+        output_name = f"tailored_cv_{run_id}"
+        pipeline_upload, upload_path = upload_path, None  # The pipeline cleans it up
+        resume_data, _, _, ats_analysis, (ats_tailored, ats_uplift) = await run_tailoring_pipeline_async(
+            generate_resume(), cv_text, job_description, pipeline_upload, output_name,
+        )
+
+        return jsonify({
+            "success": True,
+            "download_url": f"/download/{output_name}.pdf",
+            "preview_url": f"/preview/{output_name}.html",
+            "resume_data": resume_data,
+            "ats_score": ats_analysis,
+            "ats_tailored": ats_tailored,
+            "ats_uplift": ats_uplift,
+            "cv_text": cv_text,
+        })
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if upload_path is not None:
+            core.remove_upload(upload_path)
+
+
+@app.route("/generate_jobkit", methods=["POST"])
+async def generate_jobkit():
+    """
+    Unified endpoint: Generate CV + Cover Letter + Gap Analysis in ONE LLM call.
+    With ?mode=parallel the three are generated as concurrent calls instead.
+    """
+    pdf_file, job_description, error = await read_upload_form()
+    if error:
+        return error
+
+    upload_path = None
+    try:
+        run_id = uuid.uuid4().hex
+        upload_path, cv_text = await save_and_extract(pdf_file, run_id)
+        if not cv_text.strip():
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+
+        use_cache, requester = core.llm_cache_allowed(request), core.client_id(request)
+        if request.args.get("mode") == "parallel":
+            generation = generate_jobkit_fanout_async(cv_text, job_description, use_cache, requester)
+        else:
+            system_prompt, user_prompt = await build_prompts_async(
+                core.build_jobkit_prompts, cv_text, job_description
+            )
+
+            async def generate_kit():
+                llm_response = await call_ollama_async(
+                    system_prompt, user_prompt, max_tokens=8192, use_cache=use_cache,
+                    client_id=requester, priority=PRIORITY_BULK,
+                )
+                return core.parse_llm_response(llm_response)
+
+            generation = generate_kit()
+
+        output_name = f"tailored_cv_{run_id}"
+        pipeline_upload, upload_path = upload_path, None  # The pipeline cleans it up
+        (resume_data, cover_letter_data, gap_analysis_data,
+         ats_analysis, tailored_score) = await run_tailoring_pipeline_async(
+            generation, cv_text, job_description, pipeline_upload, output_name,
+        )
+
+        body = core.jobkit_response(
+            output_name, resume_data, cv_text, job_description,
+            cover_letter_data, gap_analysis_data,
+            ats_analysis=ats_analysis, tailored_score=tailored_score,
+        )
+        body["preview_url"] = f"/preview/{output_name}.html"
+        return jsonify(body)
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if upload_path is not None:
+            core.remove_upload(upload_path)
+
+
+@app.route("/generate_jobkit_stream", methods=["POST"])
+async def generate_jobkit_stream():
+    """Async counterpart of app.generate_jobkit_stream (same SSE events)."""
+    pdf_file, job_description, error = await read_upload_form()
+    if error:
+        return error
+
+    run_id = uuid.uuid4().hex
+    try:
+        upload_path, cv_text = await save_and_extract(pdf_file, run_id)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    if not cv_text.strip():
+        core.remove_upload(upload_path)
+        return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+
+    use_cache = core.llm_cache_allowed(request)
+    requester = core.client_id(request)
+    output_name = f"tailored_cv_{run_id}"
+
+    async def events():
+        pdf_task = None
+        try:
+            ats_analysis, semantic_future = await asyncio.to_thread(
+                core.start_ats, cv_text, job_description
+            )
+            yield core.sse_event("ats", ats_analysis)
+            yield core.sse_event("stage", {"stage": "generating"})
+            system_prompt, user_prompt = await build_prompts_async(
+                core.build_jobkit_prompts, cv_text, job_description
+            )
+            parts = []
+            chars = 0
+            last_sent = 0.0
+            parser = IncrementalJSONParser()
+            chunks = stream_ollama_async(
+                system_prompt, user_prompt, max_tokens=8192, use_cache=use_cache,
+                client_id=requester, priority=PRIORITY_BULK,
+            )
+            async for chunk in chunks:
+                parts.append(chunk["text"])
+                chars += len(chunk["text"])
+                if semantic_future is not None and semantic_future.done():
+                    if "semantic" in core.with_semantic(ats_analysis, semantic_future, 0):
+                        yield core.sse_event("ats", ats_analysis)
+                    semantic_future = None
+
+                for path, value in parser.feed(chunk["text"]):
+                    if not core.is_streamed_section(path):
+                        continue
+                    yield core.sse_event("section", {"path": list(path), "value": value})
+                    if path == ("resume",):
+                        early_resume = core.normalize_resume_data(value)
+                        pdf_task = asyncio.create_task(generate_pdf_async(early_resume, output_name))
+
+                now = time.time()
+                if chunk["done"] or now - last_sent >= core.SSE_PROGRESS_INTERVAL:
+                    last_sent = now
+                    yield core.sse_event("progress", {
+                        "tokens": chunk["tokens"],
+                        "tokens_per_sec": chunk["tokens_per_sec"],
+                        "chars": chars,
+                    })
+
+            yield core.sse_event("stage", {"stage": "rendering"})
+            await asyncio.to_thread(core.with_semantic, ats_analysis, semantic_future)
+            full_data = parser.root
+            if full_data is None:
+                full_data = core.parse_llm_response("".join(parts))
+            resume_data, cover_letter_data, gap_analysis_data = core.unpack_jobkit(full_data)
+            if pdf_task is not None:
+                await pdf_task
+            else:
+                await generate_pdf_async(resume_data, output_name)
+            result = await asyncio.to_thread(
+                core.jobkit_response,
+                output_name, resume_data, cv_text, job_description,
+                cover_letter_data, gap_analysis_data, ats_analysis=ats_analysis,
+            )
+            yield core.sse_event("result", result)
+        except Exception as e:
+            traceback.print_exc()
+            yield core.sse_event("error", {"error": str(e)})
+        finally:
+            # Also runs when the client disconnects mid-stream
+            core.remove_upload(upload_path)
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/preflight", methods=["POST"])
+async def preflight():
+    """Async counterpart of app.preflight; the queued Job Kit runs on app.py's job queue."""
+    pdf_file, job_description, error = await read_upload_form()
+    if error:
+        return error
+
+    run_id = uuid.uuid4().hex
+    upload_path = await save_upload(pdf_file, run_id)
+    queued = False
+    try:
+        body = await asyncio.to_thread(core.preflight_analysis, upload_path, job_description)
+        if body is None:
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+
+        if request.args.get("start") == "jobkit":
+            job = core.job_queue.submit(
+                "jobkit", core.run_jobkit_job, upload_path, job_description, run_id,
+                use_cache=core.llm_cache_allowed(request), client_id=core.client_id(request),
+            )
+            queued = True
+            body["job_id"] = job.id
+            body["status_url"] = f"/jobs/{job.id}"
+        return jsonify(body)
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if not queued:
+            core.remove_upload(upload_path)
+
+
+@app.route("/jobs/jobkit", methods=["POST"])
+async def submit_jobkit_job():
+    """Queue a Job Kit generation on app.py's job queue; poll GET /jobs/<job_id>."""
+    pdf_file, job_description, error = await read_upload_form()
+    if error:
+        return error
+
+    run_id = uuid.uuid4().hex
+    upload_path = await save_upload(pdf_file, run_id)
+    job = core.job_queue.submit(
+        "jobkit", core.run_jobkit_job, upload_path, job_description, run_id,
+        use_cache=core.llm_cache_allowed(request), client_id=core.client_id(request),
+    )
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+    }), 202
+
+
+@app.route("/jobs/<job_id>")
+async def job_status(job_id):
+    """Status of a queued job; includes the result once it is done."""
+    job = core.job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+async def _single_prompt_route(build_prompts):
+    data = await request.get_json()
+    cv_text = (data or {}).get("cv_text", "")
+    job_description = (data or {}).get("job_description", "")
+
+    if not cv_text or not job_description:
+        return jsonify({"error": "Missing CV text or Job Description"}), 400
+
+    try:
+        system_prompt, user_prompt = await build_prompts_async(build_prompts, cv_text, job_description)
+        response = await call_ollama_async(
+            system_prompt, user_prompt, use_cache=core.llm_cache_allowed(request),
+            client_id=core.client_id(request), priority=PRIORITY_INTERACTIVE,
+        )
+        return jsonify(core.parse_llm_response(response))
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/generate_cover_letter", methods=["POST"])
+async def generate_cover_letter():
+    """Generate a cover letter based on resume and JD."""
+    return await _single_prompt_route(core.build_cover_letter_prompts)
+
+
+@app.route("/generate_gap_analysis", methods=["POST"])
+async def generate_gap_analysis():
+    """Generate gap analysis based on resume and JD."""
+    return await _single_prompt_route(core.build_gap_analysis_prompts)
+
+
+@app.route("/render_pdf", methods=["POST"])
+async def render_pdf():
+    """Render resume JSON to a PDF and stream it back without saving a copy."""
+    data = await request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Missing resume data"}), 400
+
+    try:
+        resume_data = core.normalize_resume_data(data.get("resume_data", data))
+        html_content = await asyncio.to_thread(core.render_cv_html, resume_data)
+        pdf_bytes = await core.browser_pool.run_async(
+            core.pdf_render_fn(html_content), timeout=core.PDF_RENDER_TIMEOUT
+        )
+        return await send_file(
+            io.BytesIO(pdf_bytes),
+            as_attachment=True,
+            attachment_filename="tailored_cv.pdf",
+            mimetype="application/pdf",
+        )
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/catalog/jobs", methods=["POST"])
+async def catalog_add_jobs():
+    """Add job postings to the catalog (same body as app.catalog_add_jobs)."""
+    jobs, message = core.check_catalog_jobs(await request.get_json(silent=True))
+    if message:
+        return jsonify({"error": message}), 400
+
+    try:
+        ids = await asyncio.to_thread(core.add_catalog_jobs, jobs)
+        return jsonify({"success": True, "added": len(ids), "ids": ids, "total": len(core.job_catalog)})
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/catalog/match", methods=["POST"])
+async def catalog_match():
+    """Upload a CV (form field "pdf") and get the best-matching catalog jobs. ?k= sets how many."""
+    pdf_file, _, error = await read_upload_form(require_job_description=False)
+    if error:
+        return error
+    k = top_k()
+
+    upload_path = await save_upload(pdf_file, uuid.uuid4().hex)
+    try:
+        body = await asyncio.to_thread(core.match_catalog_upload, upload_path, k)
+        if body is None:
+            return jsonify({"error": "Could not extract text from PDF. The file may be image-based."}), 400
+        return jsonify(body)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        core.remove_upload(upload_path)
+
+
+@app.route("/corpus/cvs", methods=["POST"])
+async def corpus_add_cvs():
+    """Extract and index one or more CVs (form field "pdf", repeatable) for reverse search."""
+    files = await request.files
+    pdf_files = [f for f in files.getlist("pdf") if f.filename]
+    if not pdf_files:
+        return jsonify({"error": "No PDF file uploaded"}), 400
+    if any(not f.filename.lower().endswith(".pdf") for f in pdf_files):
+        return jsonify({"error": "File must be a PDF"}), 400
+
+    run_id = uuid.uuid4().hex
+    added, skipped = [], []
+    for pdf_file in pdf_files:
+        upload_path = await save_upload(pdf_file, run_id)
+        try:
+            sha = await asyncio.to_thread(core.index_corpus_upload, upload_path, pdf_file.filename)
+            if sha is None:
+                skipped.append(pdf_file.filename)
+                continue
+            added.append(sha)
+        except Exception:
+            traceback.print_exc()
+            skipped.append(pdf_file.filename)
+        finally:
+            core.remove_upload(upload_path)
+
+    return jsonify({"success": True, "added": added, "skipped": skipped, "total": len(core.cv_corpus)})
+
+
+@app.route("/corpus/search", methods=["POST"])
+async def corpus_search():
+    """Rank stored CVs against a job description (form or JSON field "job_description")."""
+    data = await request.get_json(silent=True) or await request.form
+    job_description = str(data.get("job_description", "")).strip()
+    if not job_description:
+        return jsonify({"error": "Job description is required"}), 400
+    k = top_k()
+
+    try:
+        started = time.time()
+        matches = await asyncio.to_thread(core.search_corpus_cvs, job_description, k)
+        return jsonify({
+            "success": True,
+            "corpus_size": len(core.cv_corpus),
+            "matches": matches,
+            "timing_ms": {"search": round((time.time() - started) * 1000)},
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/stats/cache")
+async def cache_stats():
+    """Hit/miss counters and sizes of the LLM response and PDF text caches."""
+    return jsonify(await asyncio.to_thread(core.cache_summary))
+
+
+@app.route("/stats/catalog")
+async def catalog_stats():
+    """Size of the job catalog and CV corpus indexes."""
+    return jsonify(await asyncio.to_thread(core.catalog_summary))
+
+
+@app.route("/stats/ats")
+async def ats_stats():
+    """Average ATS score before and after tailoring, per model, and the IDF corpus size."""
+    return jsonify(core.ats_summary())
+
+
+@app.route("/stats/llm")
+async def llm_stats():
+    """LLM scheduler queue depth, in-flight generations and wait times."""
+    return jsonify({**core.llm_scheduler.stats(), "jobs": core.job_queue.stats()})
+
+
+@app.route("/download/<filename>")
+async def download(filename):
+    """Serve a generated PDF."""
+    file_path = core.OUTPUT_FOLDER / filename
+    if not file_path.exists():
+        return jsonify({"error": "File not found"}), 404
+    return await send_file(
+        str(file_path),
+        as_attachment=True,
+        attachment_filename=filename,
+        mimetype="application/pdf",
+    )
+
+
+@app.route("/preview/<filename>")
+async def preview(filename):
+    """Serve the HTML preview of a generated CV."""
+    file_path = core.OUTPUT_FOLDER / filename
+    if file_path.suffix != ".html" or not file_path.exists():
+        return jsonify({"error": "File not found"}), 404
+    return await send_file(str(file_path), mimetype="text/html")
+
+
+# ─────────────────────────────────────────────
+# Entry
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    print("\n🚀 CV Builder (async) running at http://localhost:5000")
+    print("   Make sure Ollama is running (ollama serve)\n")
+    app.run(port=5000)
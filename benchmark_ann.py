@@ -0,0 +1,109 @@
+"""
+Recall / latency benchmark for the IVF vector index (ann_index.py).
+
+Builds an index of N synthetic vectors per size, then compares IVF search
+at several `nprobe` settings with exact brute-force search: recall@10
+against the exact top 10, and per-query latency on this CPU.
+
+The vectors are drawn from a Gaussian mixture, because real CV/JD
+embeddings are clustered by topic. Uniformly random vectors are the worst
+case for any IVF index and say little about real use.
+
+Usage:  python benchmark_ann.py [sizes] [dim] [queries]
+        python benchmark_ann.py 10000,100000,1000000 768 200
+"""
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+
+sizes = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [10_000, 100_000, 1_000_000]
+dim = int(sys.argv[2]) if len(sys.argv) > 2 else 768
+n_queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+K = 10
+NPROBES = (1, 4, 16, 64)
+CHUNK = 50_000
+CLUSTERS = 256  # Topics in the synthetic mixture; independent of the index's list count
+SPREAD = 1.5    # Noise vs. topic centre; a point's cosine to its centre is about 0.55
+
+print("=" * 60)
+print(f"ANN BENCHMARK: IVF vs. exact, dim={dim}, {n_queries} queries, recall@{K}")
+print("=" * 60)
+
+
+def normalize(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def percentile_ms(timings, p):
+    return np.percentile(timings, p) * 1000
+
+
+for n in sizes:
+    print(f"\n[N = {n:,}]  (vectors file: {n * dim * 4 / 2**30:.2f} GiB)")
+    rng = np.random.default_rng(n)
+    centers = rng.normal(size=(CLUSTERS, dim)).astype(np.float32)
+
+    def sample(count):
+        labels = rng.integers(0, len(centers), count)
+        return normalize(centers[labels] + SPREAD * rng.normal(size=(count, dim)).astype(np.float32))
+
+    queries = sample(n_queries)
+    best_scores = np.full((n_queries, K), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((n_queries, K), dtype=np.int64)
+
+    with tempfile.TemporaryDirectory() as folder:
+        index = IVFIndex(folder, nprobe=16)
+
+        # ─── Build (incremental adds) + exact top-k, chunk by chunk ───
+        start = time.perf_counter()
+        for offset in range(0, n, CHUNK):
+            vectors = sample(min(CHUNK, n - offset))
+            index.add_many([str(offset + i) for i in range(len(vectors))], vectors)
+
+            scores = queries @ vectors.T
+            all_scores = np.concatenate([best_scores, scores], axis=1)
+            all_rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(offset, offset + len(vectors)), scores.shape)], axis=1
+            )
+            top = np.argpartition(-all_scores, K - 1, axis=1)[:, :K]
+            best_scores = np.take_along_axis(all_scores, top, axis=1)
+            best_rows = np.take_along_axis(all_rows, top, axis=1)
+        build = time.perf_counter() - start
+        print(f"  Build: {build:.1f}s incremental ({n / build:,.0f} vectors/s)  {index.stats()}")
+
+        start = time.perf_counter()
+        index.train()
+        print(f"  Retrain on all vectors: {time.perf_counter() - start:.1f}s  {index.stats()}")
+        truth = [set(map(str, rows)) for rows in best_rows]
+
+        # ─── Exact search over the memory-mapped vectors ───
+        stored = np.memmap(f"{folder}/vectors.f32", dtype=np.float32, mode="r", shape=(n, dim))
+        timings = []
+        for q in queries[:min(n_queries, 20)]:
+            start = time.perf_counter()
+            scores = np.concatenate([stored[i:i + CHUNK] @ q for i in range(0, n, CHUNK)])
+            np.argpartition(-scores, K - 1)[:K]
+            timings.append(time.perf_counter() - start)
+        print(f"  Exact:        p50 {percentile_ms(timings, 50):7.2f} ms  p95 {percentile_ms(timings, 95):7.2f} ms  recall 1.000")
+        del stored
+
+        # ─── IVF search ───
+        for nprobe in NPROBES:
+            timings = []
+            hits = 0
+            for q, expected in zip(queries, truth):
+                start = time.perf_counter()
+                found = index.search(q, k=K, nprobe=nprobe)
+                timings.append(time.perf_counter() - start)
+                hits += len(expected & {key for key, _ in found})
+            print(
+                f"  nprobe={nprobe:<3}   p50 {percentile_ms(timings, 50):7.2f} ms  "
+                f"p95 {percentile_ms(timings, 95):7.2f} ms  recall {hits / (K * n_queries):.3f}"
+            )
+        del index
+
+print("\n" + "=" * 60)
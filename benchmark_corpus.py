@@ -0,0 +1,96 @@
+"""
+Correctness / latency check for CV corpus search (app.search_corpus_cvs).
+
+Indexes N synthetic CVs into a temporary corpus, then for each job
+description compares the indexed search's top k with a brute-force ATS
+ranking of every CV (ATSScorer.score_cvs). The ATS scores of the two top k
+lists must be identical; ties may be broken differently. The job
+descriptions repeat phrases no earlier search has used, so the phrase
+backfill is exercised too. Exits with status 1 on any mismatch.
+
+Usage:  python benchmark_corpus.py [cvs] [queries] [k]
+"""
+import random
+import sys
+import tempfile
+import time
+
+import app as core
+from keyword_index import KeywordIndex
+
+n_cvs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+WORDS = [f"term{i}" for i in range(400)] + (
+    "python java docker kubernetes aws sql react customer service support "
+    "pipelines analytics platform stakeholder reporting onboarding budget"
+).split()
+PHRASES = [" ".join(random.Random(i).sample(WORDS, random.Random(i).choice((2, 3)))) for i in range(300)]
+
+print("=" * 60)
+print(f"CORPUS SEARCH CHECK: {n_cvs:,} CVs, {n_queries} queries, top {k}")
+print("=" * 60)
+
+rng = random.Random(0)
+
+
+def cv_text():
+    parts = rng.choices(WORDS, k=rng.randint(80, 250))
+    for phrase in rng.sample(PHRASES, rng.randint(2, 12)):
+        parts.insert(rng.randrange(len(parts)), phrase + ".")
+    return " ".join(parts)
+
+
+def job_description():
+    # Phrases repeated twice become keywords (ATS_NGRAM_MIN_COUNT)
+    phrases = rng.sample(PHRASES, 6)
+    parts = rng.choices(WORDS, k=40) + [p + "." for p in phrases * 2]
+    rng.shuffle(parts)
+    return " ".join(parts)
+
+
+with tempfile.TemporaryDirectory() as folder:
+    core.cv_corpus = KeywordIndex(f"{folder}/cv_corpus.sqlite3")
+    core.cv_vectors = None  # Keyword ranking only: brute force has no embeddings
+
+    texts = {}
+    start = time.perf_counter()
+    for i in range(n_cvs):
+        texts[f"cv{i}"] = cv_text()
+        core.add_corpus_cv(f"cv{i}", texts[f"cv{i}"])
+    print(f"  Indexed in {time.perf_counter() - start:.1f}s  {core.cv_corpus.stats()}")
+
+    keys = list(texts)
+    queries = [job_description() for _ in range(n_queries)]
+    mismatches = 0
+    cold_ms, warm_ms, brute_ms = [], [], []
+    for q, jd in enumerate(queries):
+        start = time.perf_counter()
+        found = [m["ats_score"]["score"] for m in core.search_corpus_cvs(jd, k=k)]
+        cold_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        core.search_corpus_cvs(jd, k=k)
+        warm_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        scores = core.ats_scorer.score_cvs([texts[key] for key in keys], jd)
+        expected = sorted((s["score"] for s in scores), reverse=True)[:k]
+        expected = [s for s in expected if s > 0]  # The index never returns non-matches
+        brute_ms.append((time.perf_counter() - start) * 1000)
+
+        if found != expected:
+            mismatches += 1
+            print(f"  ✗ query {q}: index {found} vs. brute force {expected}")
+
+    def p50(timings):
+        return sorted(timings)[len(timings) // 2]
+
+    print(f"  Search, new phrases: p50 {p50(cold_ms):7.1f} ms  (backfills each phrase once)")
+    print(f"  Search, repeated:    p50 {p50(warm_ms):7.1f} ms")
+    print(f"  Brute force:         p50 {p50(brute_ms):7.1f} ms")
+    print(f"  {n_queries - mismatches}/{n_queries} queries match the brute-force ranking")
+
+print("=" * 60)
+sys.exit(1 if mismatches else 0)
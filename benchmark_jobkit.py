@@ -0,0 +1,76 @@
+"""
+Wall-clock benchmark: unified Job Kit call vs. three concurrent calls.
+
+Runs both strategies against the local Ollama with the response cache
+bypassed, so every run is a real generation. For the fan-out to overlap,
+Ollama must serve requests in parallel (OLLAMA_NUM_PARALLEL >= 3) and the
+app's LLM_MAX_IN_FLIGHT must be at least 3.
+
+Usage:  python benchmark_jobkit.py [cv.pdf] [job_description.txt] [runs]
+"""
+import sys
+import time
+from pathlib import Path
+
+import app as core
+
+print("=" * 60)
+print("JOB KIT BENCHMARK: unified vs. fan-out")
+print("=" * 60)
+
+# ─── Inputs ───
+if len(sys.argv) > 1:
+    cv_text = core.extract_text_from_pdf(sys.argv[1])
+else:
+    cv_text = "NADER MAY\nEmail: test@test.com\nPhone: +971000\nExperience: 5 years customer service"
+if len(sys.argv) > 2:
+    job_description = Path(sys.argv[2]).read_text(encoding="utf-8")
+else:
+    job_description = "Customer Service Representative. Requirements: 3+ years experience, CRM tools, English fluency."
+runs = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+print(f"  CV: {len(cv_text)} chars, JD: {len(job_description)} chars, {runs} run(s) each")
+print(f"  LLM_MAX_IN_FLIGHT = {core.LLM_MAX_IN_FLIGHT}")
+if core.LLM_MAX_IN_FLIGHT < 3:
+    print("  ⚠ LLM_MAX_IN_FLIGHT < 3: the fan-out calls will partly queue behind each other")
+
+
+def run_unified():
+    system_prompt, user_prompt = core.build_jobkit_prompts(cv_text, job_description)
+    response = core.call_ollama(system_prompt, user_prompt, max_tokens=8192, use_cache=False)
+    return core.parse_llm_response(response)
+
+
+def run_fanout():
+    return core.generate_jobkit_fanout(cv_text, job_description, use_cache=False)
+
+
+def measure(name, fn):
+    print(f"\n[{name}]")
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        try:
+            data = fn()
+        except Exception as e:
+            print(f"  ❌ Run {i + 1} FAILED: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        print(f"  Run {i + 1}: {elapsed:.1f}s  (keys: {list(data.keys())})")
+    if timings:
+        print(f"  ✅ Best {min(timings):.1f}s, mean {sum(timings) / len(timings):.1f}s")
+    return timings
+
+
+unified = measure("UNIFIED: one call", run_unified)
+fanout = measure("FAN-OUT: three concurrent calls", run_fanout)
+
+print("\n" + "=" * 60)
+if unified and fanout:
+    u = sum(unified) / len(unified)
+    f = sum(fanout) / len(fanout)
+    print(f"Mean unified {u:.1f}s vs fan-out {f:.1f}s  ->  {u / f:.2f}x")
+else:
+    print("Not enough successful runs to compare.")
+print("=" * 60)
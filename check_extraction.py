@@ -0,0 +1,81 @@
+"""
+Regression check: multi-page PDF extraction through the process pool with
+app.py loaded, as under `python app.py`.
+
+Pool workers are spawned, and a spawned worker re-runs the main script
+before it does any work. Here that script imports app, just as a worker
+started by `python app.py` re-runs app.py itself. So if app.py opens a
+cache, an index or its folder lock at import, the workers hit it too. The
+server-side state is built first (the IDF index and, with semantic search
+on, the vector indexes hold their folder locks). Then a 4-page PDF is
+extracted with 2 workers. Exits with status 1 if extraction fails.
+
+Usage:  python check_extraction.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import app as core
+
+
+def write_pdf(path, pages):
+    """A plain PDF with one Helvetica line per string, one page per list."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    Path(path).write_text(out, encoding="latin-1")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MULTI-PAGE EXTRACTION CHECK (process pool, app.py loaded)")
+    print("=" * 60)
+
+    # What a running server holds by the time a CV is uploaded
+    for index in (core.jd_idf_index, core.job_vectors, core.cv_vectors):
+        if index is not None:
+            index.stats()
+
+    core.PDF_EXTRACT_WORKERS = 2
+    core.PDF_PARALLEL_MIN_PAGES = 3
+    run = int(time.time() * 1000)  # Fresh content: no extraction cache hit
+    pages = [[f"Page {n} of check run {run}", f"Experience entry {n}"] for n in range(1, 5)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = Path(folder) / "cv.pdf"
+        write_pdf(pdf_path, pages)
+        start = time.perf_counter()
+        try:
+            result = core.extract_pdf_cached(pdf_path)
+        except Exception as e:
+            print(f"  ❌ FAILED: {type(e).__name__}: {e}")
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+
+    missing = [lines[0] for lines in pages if lines[0] not in result["text"]]
+    if len(result["pages"]) != len(pages) or missing:
+        print(f"  ❌ FAILED: {len(result['pages'])} pages extracted, missing {missing}")
+        sys.exit(1)
+    print(f"  ✅ {len(pages)} pages extracted with 2 workers in {elapsed:.1f}s")
+    print("=" * 60)
@@ -0,0 +1,437 @@
+"""
+Section-aware CV parsing from positioned words.
+
+extract_word_boxes() gives every word with its position, font size and
+weight. parse_cv() rebuilds the lines of each column, finds the section
+headings (known titles such as "Work Experience", and lines styled like
+them) and turns the sections into a structured CV:
+
+    {
+        "name": "Jane Doe",
+        "headline": ["Senior Python Developer", "Berlin"],
+        "contact": {"email": ..., "phone": ..., "links": [...]},
+        "summary": "...",
+        "experience": [{"title": ..., "dates": ..., "bullets": [...]}],
+        "education": [...],
+        "projects": [...],
+        "skills": ["Python", "Docker"],
+        "other": {"certifications": [...], "languages": [...]},
+        "sections": ["summary", "experience", ...],   # as found, in order
+        "reliable": True,   # enough known sections to trust the parse
+    }
+
+cv_to_text() renders it back as compact text for prompts, and fits it to a
+character budget by dropping whole bullets (least relevant to a job first)
+and low-priority sections. cv_brief()
+narrows it to a few sections and the most relevant experience entries
+first, for prompts that need less than the whole CV.
+"""
+import re
+from collections import Counter
+
+SECTION_TITLES = {
+    "summary": (
+        "summary", "professional summary", "profile", "professional profile", "about me",
+        "about", "objective", "career objective", "personal statement", "overview",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "relevant experience",
+    ),
+    "education": (
+        "education", "academic background", "education and training",
+        "academic qualifications", "qualifications",
+    ),
+    "skills": (
+        "skills", "technical skills", "core skills", "key skills", "core competencies",
+        "competencies", "expertise", "areas of expertise", "skills and tools",
+        "tools and technologies", "technologies",
+    ),
+    "projects": ("projects", "personal projects", "key projects", "selected projects"),
+    "certifications": (
+        "certifications", "certificates", "licenses and certifications",
+        "certifications and licenses", "courses", "training",
+    ),
+    "languages": ("languages",),
+    "awards": ("awards", "honors", "honours", "achievements", "awards and honors"),
+    "publications": ("publications",),
+    "volunteering": ("volunteering", "volunteer experience"),
+    "contact": (
+        "contact", "contact details", "contact information", "personal details",
+        "personal information",
+    ),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references", "referees"),
+}
+ENTRY_SECTIONS = ("experience", "education", "projects", "volunteering")
+SKIP_SECTIONS = ("references", "interests")  # Left out of prompts
+DROP_FIRST = ("references", "interests")     # Over budget: dropped whole before any bullet
+KEEP_SECTIONS = ("languages", "certifications")  # Over budget: never dropped
+
+_TITLE_LOOKUP = {title: section for section, titles in SECTION_TITLES.items() for title in titles}
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+# "(cid:N)" is how pdfplumber shows glyphs without a Unicode mapping, often bullets
+_BULLET_RE = re.compile(r"^\s*(?:[•●▪◦‣∙·\-–—*]|\(cid:\d+\))\s*")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*)?(?:\d{{1,2}}/)?(?:19|20)\d{{2}}"
+_DATE_RANGE_RE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now|today)|{_DATE}",
+    re.IGNORECASE,
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_LINK_RE = re.compile(
+    r"(?:https?://|www\.)\S+|(?:linkedin|github|gitlab)\.com/\S+", re.IGNORECASE
+)
+_PAGE_NUMBER_RE = re.compile(r"^\s*(?:page\s*)?\d+\s*(?:(?:of|/)\s*\d+)?\s*$", re.IGNORECASE)
+_SKILL_SPLIT_RE = re.compile(r"\s*(?:[,;|•●▪·]|\(cid:\d+\)|\s[-–]\s)\s*")
+
+_COLUMN_SPLIT = 0.35  # Sidebar boundary, as in pdf_extract.page_to_text
+_LINE_GRID = 5        # Points; words whose tops round together share a line
+
+
+def _heading_key(text):
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower().replace("&", " and ")).split())
+
+
+# ── Lines ──
+
+def _is_single_column(words, mid):
+    # Single-column pages put words across the sidebar boundary on many lines
+    rows = {}
+    for w in words:
+        rows.setdefault(round(w["top"] / _LINE_GRID), []).append(w)
+    crossing = 0
+    for row in rows.values():
+        row.sort(key=lambda w: w["x0"])
+        if any(w["x0"] < mid < w["x1"] for w in row) or any(
+            a["x1"] < mid <= b["x0"] and b["x0"] - a["x1"] < 12 for a, b in zip(row, row[1:])
+        ):
+            crossing += 1
+    return crossing >= 0.25 * len(rows)
+
+
+def _lines(words):
+    lines = []
+    current = []
+    for w in sorted(words, key=lambda w: (round(w["top"] / _LINE_GRID), w["x0"])):
+        if current and round(w["top"] / _LINE_GRID) != round(current[-1]["top"] / _LINE_GRID):
+            lines.append(_line(current))
+            current = []
+        current.append(w)
+    if current:
+        lines.append(_line(current))
+    return lines
+
+
+def _line(words):
+    return {
+        "text": " ".join(w["text"] for w in words),
+        "size": max(w.get("size", 0) for w in words),
+        "bold": all(w.get("bold", False) for w in words),
+    }
+
+
+def _columns(pages):
+    """
+    Each page's columns as (page number, lines): sidebar first, then main
+    content.
+    """
+    columns = []
+    for number, page in enumerate(pages):
+        words = page["words"]
+        if not words:
+            if page.get("fallback_text"):
+                columns.append((number, [
+                    {"text": t, "size": 0, "bold": False}
+                    for t in page["fallback_text"].splitlines() if t.strip()
+                ]))
+            continue
+        mid = page["width"] * _COLUMN_SPLIT
+        if _is_single_column(words, mid):
+            columns.append((number, _lines(words)))
+        else:
+            for column in ([w for w in words if w["x0"] < mid], [w for w in words if w["x0"] >= mid]):
+                if column:
+                    columns.append((number, _lines(column)))
+    return columns
+
+
+# ── Parsing ──
+
+def parse_cv(pages):
+    """Structured CV (see module docstring) from extract_word_boxes() pages."""
+    columns = _columns(pages)
+    all_lines = [line for _, column in columns for line in column]
+    sizes = Counter(line["size"] for line in all_lines for _ in line["text"].split())
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    # The name: the largest line among the first few, unless it is a section title
+    name_line = None
+    for line in all_lines[:8]:
+        if _heading_key(line["text"]) in _TITLE_LOOKUP or not line["size"]:
+            continue
+        if line["size"] > body_size and (name_line is None or line["size"] > name_line["size"]):
+            name_line = line
+
+    # Headings: known titles, then other short lines styled exactly like them.
+    # When the titles stand out (bold or larger), a plain-text "Training" or
+    # "Projects" line is body text, not a heading.
+    styles = {
+        (line["size"], line["bold"])
+        for line in all_lines
+        if _heading_key(line["text"]) in _TITLE_LOOKUP and len(line["text"].split()) <= 5
+        and (line["bold"] or line["size"] > body_size)
+    }
+
+    def heading_of(line):
+        if line is name_line or len(line["text"].split()) > 5:
+            return None
+        key = _heading_key(line["text"])
+        styled = (line["size"], line["bold"]) in styles
+        if key in _TITLE_LOOKUP:
+            return _TITLE_LOOKUP[key] if styled or not styles else None
+        if not key or any(ch.isdigit() for ch in key):
+            return None
+        if not styles:
+            styled = body_size and line["size"] >= body_size * 1.2
+        return key if styled else None
+
+    sections = {}
+    order = []
+    header = []
+    current = None
+    for number, column in columns:
+        if number == 0:
+            current = None  # Lines above a first-page column's first heading: the header
+        # On later pages they continue the section the previous page ended in,
+        # minus a repeated page header (the name, or lines from the first one)
+        repeated = {line["text"] for line in header}
+        top_of_page = number > 0
+        for line in column:
+            if line is name_line or _PAGE_NUMBER_RE.match(line["text"]):
+                continue
+            if top_of_page and (line["text"] in repeated or (
+                name_line is not None and line["size"] >= name_line["size"]
+            )):
+                continue
+            section = heading_of(line)
+            top_of_page = top_of_page and section is None
+            if section is not None:
+                current = section
+                if section not in sections:
+                    sections[section] = []
+                    order.append(section)
+                continue
+            (sections[current] if current is not None else header).append(line)
+
+    text = "\n".join(line["text"] for line in all_lines)
+    contact_lines = header + sections.get("contact", [])
+    contact_text = "\n".join(line["text"] for line in contact_lines)
+    email = _EMAIL_RE.search(contact_text) or _EMAIL_RE.search(text)
+    phone = _PHONE_RE.search(contact_text)
+    links = list(dict.fromkeys(_LINK_RE.findall(contact_text)))
+
+    cv = {
+        "name": name_line["text"] if name_line else "",
+        "headline": [
+            line["text"] for line in header
+            if not (_EMAIL_RE.search(line["text"]) or _PHONE_RE.search(line["text"])
+                    or _LINK_RE.search(line["text"]))
+        ],
+        "contact": {
+            "email": email.group() if email else "",
+            "phone": phone.group().strip() if phone else "",
+            "links": links,
+        },
+        "summary": " ".join(line["text"] for line in sections.get("summary", [])),
+        "skills": _skills(sections.get("skills", [])),
+        "other": {},
+        "sections": order,
+    }
+    for section in ENTRY_SECTIONS:
+        cv[section] = _entries(sections.get(section, []), body_size)
+    handled = {"summary", "skills", "contact", *ENTRY_SECTIONS}
+    for section in order:
+        if section not in handled:
+            cv["other"][section] = [_strip_bullet(line["text"]) for line in sections[section]]
+    cv["reliable"] = len({"experience", "education", "skills", "summary"} & set(order)) >= 2
+    return cv
+
+
+def _strip_bullet(text):
+    return _BULLET_RE.sub("", text).strip()
+
+
+def _entries(lines, body_size):
+    """
+    Split a section into entries. An entry starts at a non-bullet line that
+    is bold, larger than body text or holds a date, once the previous entry
+    has bullets, or has both a date and a title; lines before the first
+    bullet are the entry's title lines.
+    """
+    entries = []
+    current = None
+    continuing = False  # The last bullet may wrap onto the next line
+    for line in lines:
+        raw = line["text"]
+        text = _strip_bullet(raw)
+        if not text:
+            continue
+        is_bullet = text != raw.strip()
+        date = _DATE_RANGE_RE.search(text)
+        starts_entry = not is_bullet and (
+            line["bold"] or (body_size and line["size"] > body_size + 0.5) or date is not None
+        )
+        if current is None or (starts_entry and (current["bullets"] or (
+            current["dates"] and any(_DATE_RANGE_RE.sub("", t).strip(" |,-–") for t in current["title"])
+        ))):
+            current = {"title": [], "dates": "", "bullets": []}
+            entries.append(current)
+            continuing = False
+        if date is not None and not current["dates"] and not current["bullets"]:
+            current["dates"] = date.group()
+
+        if is_bullet:
+            current["bullets"].append(text)
+            continuing = True
+        elif current["bullets"] and continuing and not starts_entry:
+            current["bullets"][-1] += " " + text
+        elif current["bullets"] or (not starts_entry and len(text.split()) > 8):
+            current["bullets"].append(text)  # Prose description lines
+            continuing = False
+        else:
+            current["title"].append(text)
+    return [
+        {"title": " | ".join(e["title"]), "dates": e["dates"], "bullets": e["bullets"]}
+        for e in entries
+    ]
+
+
+def _skills(lines):
+    skills = []
+    seen = set()
+    for line in lines:
+        for item in _SKILL_SPLIT_RE.split(_strip_bullet(line["text"])):
+            item = item.strip(" .:")
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                skills.append(item)
+    return skills
+
+
+# ── Rendering ──
+
+def cv_brief(cv, sections, relevance=None, experience_entries=None):
+    """
+    A copy of a parsed CV with only `sections` (name, headline and contact
+    always stay). With `experience_entries`, experience keeps that many
+    entries: the most relevant by `relevance(text)`, the more recent
+    (listed earlier) among equals, in their original order.
+    """
+    brief = dict(cv)
+    if "summary" not in sections:
+        brief["summary"] = ""
+    if "skills" not in sections:
+        brief["skills"] = []
+    for section in ENTRY_SECTIONS:
+        if section not in sections:
+            brief[section] = []
+    brief["other"] = {section: lines for section, lines in cv["other"].items() if section in sections}
+
+    entries = brief["experience"]
+    if experience_entries is not None and len(entries) > experience_entries:
+        def score(i):
+            if relevance is None:
+                return 0
+            return relevance(" ".join([entries[i]["title"], *entries[i]["bullets"]]))
+
+        keep = sorted(range(len(entries)), key=lambda i: (-score(i), i))[:experience_entries]
+        brief["experience"] = [entries[i] for i in sorted(keep)]
+    return brief
+
+
+def cv_to_text(cv, relevance=None, max_chars=None, skip=SKIP_SECTIONS, keep=KEEP_SECTIONS):
+    """
+    Compact text of a parsed CV for prompts. With `max_chars`, whole lines
+    and sections are dropped until it fits: the DROP_FIRST sections, then
+    bullets (lowest `relevance(text)` first; among equals, experience
+    bullets last and those of older entries, listed later, first), then
+    whole sections other than `keep`, the least important first. The
+    header, summary, skills, entry titles and dates and the `keep` sections
+    are never dropped, so the text can still be longer than `max_chars`
+    when they alone are.
+    """
+    dropped = set()
+    skip = set(skip)
+    text = _render(cv, dropped, skip)
+    if max_chars is None or len(text) <= max_chars:
+        return text
+
+    skip.update(section for section in DROP_FIRST if section not in keep)
+    text = _render(cv, dropped, skip)
+
+    bullets = []
+    for priority, section in enumerate(ENTRY_SECTIONS):
+        if section in skip:
+            continue
+        for i, entry in enumerate(cv[section]):
+            for j, bullet in enumerate(entry["bullets"]):
+                score = relevance(bullet) if relevance is not None else 0
+                # len + 3: the "- " and the newline
+                bullets.append((score, -priority, -i, -j, section, i, j, len(bullet) + 3))
+    bullets.sort()
+    excess = len(text) - max_chars
+    for _, _, _, _, section, i, j, length in bullets:
+        if excess <= 0:
+            break
+        dropped.add((section, i, j))
+        excess -= length
+    text = _render(cv, dropped, skip)
+
+    # Still over: other sections, last listed first, then volunteering and projects
+    for section in [*reversed(list(cv["other"])), "volunteering", "projects"]:
+        if len(text) <= max_chars:
+            break
+        if section not in keep and section not in skip:
+            skip.add(section)
+            text = _render(cv, dropped, skip)
+    return text
+
+
+def _render(cv, dropped, skip):
+    out = []
+    if cv["name"]:
+        out.append(cv["name"])
+    out.extend(cv["headline"])
+    contact = [cv["contact"]["email"], cv["contact"]["phone"], *cv["contact"]["links"]]
+    if any(contact):
+        out.append(" | ".join(c for c in contact if c))
+    if cv["summary"]:
+        out += ["", "SUMMARY", cv["summary"]]
+
+    def entries(section):
+        if not cv[section] or section in skip:
+            return
+        out.extend(["", section.upper()])
+        for i, entry in enumerate(cv[section]):
+            title = entry["title"]
+            if entry["dates"] and entry["dates"] not in title:
+                title = f"{title} ({entry['dates']})" if title else entry["dates"]
+            out.append(title)
+            out.extend(
+                f"- {bullet}" for j, bullet in enumerate(entry["bullets"])
+                if (section, i, j) not in dropped
+            )
+
+    entries("experience")
+    entries("projects")
+    entries("education")
+    if cv["skills"]:
+        out += ["", "SKILLS", ", ".join(cv["skills"])]
+    entries("volunteering")
+    for section, lines in cv["other"].items():
+        if section in skip or not lines:
+            continue
+        out += ["", section.upper(), *lines]
+    return "\n".join(out).strip()
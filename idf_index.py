@@ -0,0 +1,144 @@
+"""
+Persistent document-frequency index for IDF term weighting.
+
+Every job description we see is added once (deduplicated by content hash).
+Document frequencies live in a memory-mapped uint32 array indexed by term
+id; the vocabulary and seen-document hashes are append-only text files.
+Adding a document only touches its own terms, so updates cost O(document),
+never a rebuild.
+
+Files in `folder`:
+    df.u32      document frequency per term id (memmap, grown by doubling)
+    vocab.txt   one term per line; line number = term id
+    docs.txt    sha256 of every document added
+    meta.json   {"documents": N}
+
+Writes go vocabulary first, then documents, then counts, so a crash can
+at worst lose one batch's counts; a count never lands on another term's
+id. One process writes a folder at a time (see index_lock).
+"""
+import hashlib
+import json
+import math
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from index_lock import lock_folder
+
+_INITIAL_CAPACITY = 4096
+
+
+class IDFIndex:
+    """
+    Smoothed IDF, log((1 + N) / (1 + df)) + 1, over the documents added so
+    far. idf() returns None until `min_documents` have been seen, since
+    weights from a handful of documents are noise.
+    """
+
+    def __init__(self, folder, min_documents=20):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.min_documents = min_documents
+        self._lock = threading.Lock()
+        self._folder_lock = lock_folder(self.folder)
+
+        self._df_path = self.folder / "df.u32"
+        self._vocab_path = self.folder / "vocab.txt"
+        self._docs_path = self.folder / "docs.txt"
+        self._meta_path = self.folder / "meta.json"
+
+        self.vocab = {}
+        if self._vocab_path.exists():
+            with open(self._vocab_path, encoding="utf-8") as f:
+                for line in f:
+                    self.vocab[line.rstrip("\n")] = len(self.vocab)
+        self._seen = set()
+        if self._docs_path.exists():
+            self._seen = set(self._docs_path.read_text(encoding="utf-8").split())
+        self.documents = 0
+        if self._meta_path.exists():
+            self.documents = json.loads(self._meta_path.read_text(encoding="utf-8"))["documents"]
+
+        capacity = _INITIAL_CAPACITY
+        if self._df_path.exists():
+            capacity = max(capacity, self._df_path.stat().st_size // 4)
+        self._df = self._open_df(capacity)
+
+    def _open_df(self, capacity):
+        mode = "r+" if self._df_path.exists() else "w+"
+        if mode == "r+" and self._df_path.stat().st_size < capacity * 4:
+            with open(self._df_path, "r+b") as f:
+                f.truncate(capacity * 4)  # New space reads as zeros
+        return np.memmap(self._df_path, dtype=np.uint32, mode=mode, shape=(capacity,))
+
+    def _ensure_capacity(self, size):
+        capacity = len(self._df)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._df.flush()
+        del self._df
+        self._df = self._open_df(capacity)
+
+    def add(self, text, terms):
+        """
+        Count `terms` (the document's distinct terms) once for `text`.
+        Returns False if this exact document was already added.
+        """
+        return self.add_many([(text, terms)]) == 1
+
+    def add_many(self, documents):
+        """Add (text, terms) pairs, persisting once. Returns how many were new."""
+        new_terms = []
+        new_docs = {}  # hash -> distinct terms
+        with self._lock:
+            for text, terms in documents:
+                doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                if doc_hash in self._seen or doc_hash in new_docs:
+                    continue
+                unique = set(terms)
+                for term in unique:
+                    if term not in self.vocab:
+                        self.vocab[term] = len(self.vocab)
+                        new_terms.append(term)
+                new_docs[doc_hash] = unique
+            if not new_docs:
+                return 0
+
+            # Term ids are on disk before any count refers to them
+            if new_terms:
+                with open(self._vocab_path, "a", encoding="utf-8") as f:
+                    f.write("".join(t + "\n" for t in new_terms))
+            with open(self._docs_path, "a", encoding="utf-8") as f:
+                f.write("".join(h + "\n" for h in new_docs))
+            self.documents += len(new_docs)
+            self._seen.update(new_docs)
+            self._meta_path.write_text(json.dumps({"documents": self.documents}), encoding="utf-8")
+
+            self._ensure_capacity(len(self.vocab))
+            for unique in new_docs.values():
+                ids = np.fromiter((self.vocab[t] for t in unique), dtype=np.int64, count=len(unique))
+                self._df[ids] += 1
+            self._df.flush()
+        return len(new_docs)
+
+    def idf(self, terms):
+        """IDF weight per term as a float array, or None while the corpus is too small."""
+        with self._lock:
+            if self.documents < self.min_documents:
+                return None
+            ids = np.fromiter((self.vocab.get(t, -1) for t in terms), dtype=np.int64, count=len(terms))
+            df = np.where(ids >= 0, self._df[np.maximum(ids, 0)], 0).astype(np.float64)
+            return np.log((1 + self.documents) / (1 + df)) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "terms": len(self.vocab),
+                "active": self.documents >= self.min_documents,
+                "max_idf": round(math.log(1 + self.documents) + 1, 3),
+            }
@@ -0,0 +1,35 @@
+"""
+Single-writer guard for the on-disk indexes (idf_index, ann_index).
+
+Their memory-mapped arrays are only consistent with the vocabulary / key
+map the owning process holds in memory, so two processes (say app.py and
+asgi_app.py started side by side) appending to the same folder would
+attribute counts and vectors to the wrong terms and keys. lock_folder()
+takes an exclusive lock on `folder/.lock` for as long as the returned file
+stays open, and raises at once if another process (or another index object
+in this one) already holds it.
+"""
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def lock_folder(folder):
+    """Lock `folder` for this process. Keep the returned file open while it is in use."""
+    handle = open(os.path.join(folder, ".lock"), "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        raise Exception(
+            f"Index folder {folder} is already open in another process. "
+            f"Run one server per index folder."
+        )
+    return handle
@@ -0,0 +1,142 @@
+"""
+Incremental JSON parser for streamed LLM output.
+
+The model writes one JSON object token by token. Instead of waiting for the
+whole response, feed() the chunks in as they arrive and get back every value
+that has just been closed, with its path, e.g.:
+
+    ("resume", "summary")          -> "3-4 sentence summary..."
+    ("resume", "experience", 0)    -> {"title": ..., "bullets": [...]}
+    ("resume",)                    -> the whole resume object
+    ()                             -> the root object (end of the response)
+"""
+import json
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+class _Frame:
+    """An open object or array."""
+
+    __slots__ = ("is_object", "start", "key", "expecting_key")
+
+    def __init__(self, is_object, start):
+        self.is_object = is_object
+        self.start = start
+        self.key = None if is_object else 0
+        self.expecting_key = is_object
+
+
+class IncrementalJSONParser:
+    """
+    Single-pass character scanner over a growing buffer. Only the structure
+    is tracked while scanning; a value is decoded with json.loads once it
+    closes, and only if its path is at most `max_depth` deep.
+    Anything before the first { or [ (e.g. a ```json fence) is skipped.
+    """
+
+    def __init__(self, max_depth=3):
+        self.max_depth = max_depth
+        self.root = None
+        self.done = False
+        self._text = ""
+        self._pos = 0
+        self._stack = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._value_start = None  # start of the current string/scalar
+
+    def feed(self, chunk):
+        """Add more text. Returns a list of (path, value) for values that closed."""
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+
+        events = []
+        text = self._text
+        i = self._pos
+        n = len(text)
+        while i < n and not self.done:
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    literal = text[self._value_start:i + 1]
+                    if self._string_is_key:
+                        self._stack[-1].key = json.loads(literal)
+                    else:
+                        self._close_value(self._value_start, i + 1, events)
+                    self._value_start = None
+                i += 1
+                continue
+
+            if self._value_start is not None:
+                # Inside a number / true / false / null
+                if c not in _SCALAR_END:
+                    i += 1
+                    continue
+                self._close_value(self._value_start, i, events)
+                self._value_start = None
+                # Fall through: the delimiter still needs handling
+
+            if not self._started:
+                if c in "{[":
+                    self._started = True
+                else:
+                    i += 1
+                    continue
+
+            if c in "{[":
+                self._stack.append(_Frame(c == "{", i))
+            elif c in "}]":
+                if not self._stack:
+                    self.done = True
+                    break
+                frame = self._stack.pop()
+                self._close_value(frame.start, i + 1, events)
+            elif c == '"':
+                self._in_string = True
+                self._value_start = i
+                top = self._stack[-1] if self._stack else None
+                self._string_is_key = bool(top and top.is_object and top.expecting_key)
+            elif c == ":":
+                if self._stack:
+                    self._stack[-1].expecting_key = False
+            elif c == ",":
+                if self._stack:
+                    top = self._stack[-1]
+                    if top.is_object:
+                        top.expecting_key = True
+                    else:
+                        top.key += 1
+            elif c not in _WHITESPACE:
+                self._value_start = i
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _path(self):
+        return tuple(frame.key for frame in self._stack)
+
+    def _close_value(self, start, end, events):
+        path = self._path()
+        if not self._stack:
+            self.done = True
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(self._text[start:end])
+        except json.JSONDecodeError:
+            return  # Malformed fragment; the full-text fallback will deal with it
+        if not path:
+            self.root = value
+        events.append((path, value))
@@ -0,0 +1,268 @@
+"""
+Persistent inverted index for ranking stored documents by ATS-style keyword
+coverage.
+
+Each document is indexed as {term: (count, weight)} plus a norm. A query is
+the same shape, and a document's score is
+
+    sum over shared terms of min(query count, doc count) * doc weight * query weight
+    -----------------------------------------------------------------------------
+                               doc norm * query norm
+
+which, filled in the way ATSScorer weighs terms, is exactly the ATS coverage
+ratio, only computed for every stored document at once. Only the posting
+lists of the query's terms are read, so a search touches a small fraction of
+a large collection.
+
+Documents and postings are stored in SQLite and loaded into compact
+in-memory posting arrays on first use; adds are written through, so the
+index survives restarts without a rebuild.
+
+A caller that indexes some terms selectively (e.g. only the phrases it has
+been asked about) can backfill a term into existing documents with
+add_postings(), which also records the term as complete: every document's
+posting for it is in, and later adds are expected to include it.
+"""
+import json
+import sqlite3
+import threading
+from array import array
+
+import numpy as np
+
+
+class KeywordIndex:
+    """
+    Term -> posting list index over documents keyed by a caller-chosen key.
+    Re-adding an existing key replaces that document.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " idx INTEGER PRIMARY KEY,"
+            " key TEXT UNIQUE NOT NULL,"
+            " text TEXT NOT NULL,"
+            " meta TEXT NOT NULL,"
+            " norm REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " count REAL NOT NULL,"
+            " weight REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_idx ON postings (idx)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS complete_terms (term TEXT PRIMARY KEY)")
+        self._conn.commit()
+        self._loaded = False
+
+    # ── Loading ──
+
+    def _load(self):
+        # Called with the lock held
+        if self._loaded:
+            return
+        self._postings = {}  # term -> (doc idx array, count array, weight array)
+        self._keys = {}      # key -> idx
+        self._idx_keys = []  # idx -> key (None once removed)
+        self._norms = array("d")
+        self._alive = bytearray()
+        for idx, key, norm in self._conn.execute("SELECT idx, key, norm FROM docs"):
+            self._grow(idx)
+            self._keys[key] = idx
+            self._idx_keys[idx] = key
+            self._norms[idx] = norm
+            self._alive[idx] = 1
+        for term, idx, count, weight in self._conn.execute(
+            "SELECT term, idx, count, weight FROM postings"
+        ):
+            self._append_posting(term, idx, count, weight)
+        self._complete = {term for term, in self._conn.execute("SELECT term FROM complete_terms")}
+        self._loaded = True
+
+    def _grow(self, idx):
+        missing = idx + 1 - len(self._norms)
+        if missing > 0:
+            self._norms.extend([0.0] * missing)
+            self._alive.extend(b"\x00" * missing)
+            self._idx_keys.extend([None] * missing)
+
+    def _append_posting(self, term, idx, count, weight):
+        lists = self._postings.get(term)
+        if lists is None:
+            lists = self._postings[term] = (array("q"), array("d"), array("d"))
+        lists[0].append(idx)
+        lists[1].append(count)
+        lists[2].append(weight)
+
+    # ── Writes ──
+
+    def add(self, key, text, terms, norm=1.0, meta=None):
+        """Index one document. `terms` is {term: (count, weight)}."""
+        self.add_many([(key, text, terms, norm, meta)])
+
+    def add_many(self, documents):
+        """Index (key, text, terms, norm, meta) tuples in one transaction."""
+        with self._lock:
+            self._load()
+            next_idx = len(self._norms)
+            for key, text, terms, norm, meta in documents:
+                old = self._keys.pop(key, None)
+                if old is not None:
+                    self._alive[old] = 0  # Its postings are skipped from now on
+                    self._idx_keys[old] = None
+                    self._conn.execute("DELETE FROM postings WHERE idx = ?", (old,))
+                    self._conn.execute("DELETE FROM docs WHERE idx = ?", (old,))
+
+                idx = next_idx
+                next_idx += 1
+                self._conn.execute(
+                    "INSERT INTO docs (idx, key, text, meta, norm) VALUES (?, ?, ?, ?, ?)",
+                    (idx, key, text, json.dumps(meta or {}, ensure_ascii=False), norm),
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings (term, idx, count, weight) VALUES (?, ?, ?, ?)",
+                    [(term, idx, count, weight) for term, (count, weight) in terms.items()],
+                )
+                self._grow(idx)
+                self._keys[key] = idx
+                self._idx_keys[idx] = key
+                self._norms[idx] = norm
+                self._alive[idx] = 1
+                for term, (count, weight) in terms.items():
+                    self._append_posting(term, idx, count, weight)
+            self._conn.commit()
+
+    def add_postings(self, term, postings):
+        """
+        Backfill `term` into already-indexed documents ({key: (count,
+        weight)}) and mark it complete. Documents that already have a
+        posting for it, or are no longer indexed, are skipped.
+        """
+        with self._lock:
+            self._load()
+            lists = self._postings.get(term)
+            have = set(lists[0]) if lists is not None else set()
+            rows = []
+            for key, (count, weight) in postings.items():
+                idx = self._keys.get(key)
+                if idx is None or idx in have:
+                    continue
+                rows.append((term, idx, count, weight))
+            self._conn.executemany(
+                "INSERT INTO postings (term, idx, count, weight) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.execute("INSERT OR IGNORE INTO complete_terms (term) VALUES (?)", (term,))
+            self._conn.commit()
+            for row in rows:
+                self._append_posting(*row)
+            self._complete.add(term)
+
+    def complete_terms(self):
+        """The terms marked complete by add_postings()."""
+        with self._lock:
+            self._load()
+            return frozenset(self._complete)
+
+    def remove(self, key):
+        with self._lock:
+            self._load()
+            idx = self._keys.pop(key, None)
+            if idx is None:
+                return False
+            self._alive[idx] = 0
+            self._idx_keys[idx] = None
+            self._conn.execute("DELETE FROM postings WHERE idx = ?", (idx,))
+            self._conn.execute("DELETE FROM docs WHERE idx = ?", (idx,))
+            self._conn.commit()
+            return True
+
+    # ── Reads ──
+
+    def search(self, terms, k=10, norm=1.0):
+        """
+        Top `k` documents for a query `terms` ({term: (count, weight)}), as
+        [(key, score)] with score in [0, 1], best first. Documents sharing no
+        term with the query are never returned.
+        """
+        with self._lock:
+            self._load()
+            if not self._keys:
+                return []
+            scores = np.zeros(len(self._norms), dtype=np.float64)
+            for term, (count, weight) in terms.items():
+                lists = self._postings.get(term)
+                if lists is None:
+                    continue
+                docs = np.frombuffer(lists[0], dtype=np.int64)
+                doc_counts = np.frombuffer(lists[1], dtype=np.float64)
+                doc_weights = np.frombuffer(lists[2], dtype=np.float64)
+                # A document holds each term once, so plain fancy-index += is safe
+                scores[docs] += np.minimum(count, doc_counts) * doc_weights * weight
+                del docs, doc_counts, doc_weights  # Release the buffers before any append
+
+            norms = np.frombuffer(self._norms, dtype=np.float64) * norm
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            scores = np.divide(scores, norms, out=np.zeros_like(scores), where=alive & (norms > 0))
+            del norms
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._idx_keys[i], float(scores[i])) for i in candidates]
+
+    def keys_with_all(self, terms):
+        """Keys of the documents that have a posting for every one of `terms`."""
+        with self._lock:
+            self._load()
+            found = None
+            for term in terms:
+                lists = self._postings.get(term)
+                if lists is None:
+                    return []
+                docs = np.frombuffer(lists[0], dtype=np.int64)
+                found = docs.copy() if found is None else np.intersect1d(found, docs)
+                del docs  # Release the buffer before any append
+            if found is None:
+                return []
+            return [self._idx_keys[i] for i in found if self._alive[i]]
+
+    def get(self, keys, batch=500):
+        """Stored {"key", "text", "meta"} for each key found, in the given order."""
+        if not keys:
+            return []
+        keys = list(keys)
+        rows = []
+        with self._lock:
+            for i in range(0, len(keys), batch):
+                part = keys[i:i + batch]
+                rows += self._conn.execute(
+                    f"SELECT key, text, meta FROM docs WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+        found = {
+            key: {"key": key, "text": text, "meta": json.loads(meta)}
+            for key, text, meta in rows
+        }
+        return [found[key] for key in keys if key in found]
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._keys)
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {
+                "documents": len(self._keys),
+                "terms": len(self._postings),
+                "postings": sum(len(lists[0]) for lists in self._postings.values()),
+            }
@@ -0,0 +1,180 @@
+"""
+Concurrency limiter and fair scheduler for LLM calls.
+
+Ollama serves a single local model; running more generations at once than
+it can batch only makes all of them slower. The scheduler caps in-flight
+calls and queues the rest:
+
+- lower `priority` numbers go first (e.g. a short cover letter before a
+  full Job Kit),
+- within a priority, users take turns (round-robin), so one user queueing
+  ten requests can't starve everyone else,
+- each user's own requests run in the order they were made.
+
+Both threads (slot) and asyncio tasks (async_slot) can wait for a slot;
+they share the same queue.
+"""
+import asyncio
+import collections
+import contextlib
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 0  # Short calls: cover letter, gap analysis
+PRIORITY_RESUME = 1       # Single tailored resume
+PRIORITY_BULK = 2         # Full Job Kit and background jobs
+
+_BUSY_MESSAGE = "The AI model is busy with other requests. Please try again in a moment."
+
+
+class _Ticket:
+    __slots__ = ("user", "priority", "enqueued_at", "wake", "granted", "cancelled")
+
+    def __init__(self, user, priority, wake):
+        self.user = user
+        self.priority = priority
+        self.enqueued_at = time.time()
+        self.wake = wake  # Called (with the lock held) when the slot is granted
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """Grants at most `max_in_flight` concurrent slots, fairly."""
+
+    def __init__(self, max_in_flight=1, wait_samples=200):
+        self.max_in_flight = max(1, max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # priority -> user -> deque of tickets
+        self._queues = collections.defaultdict(dict)
+        # priority -> deque of users with waiting tickets, in turn order
+        self._turns = collections.defaultdict(collections.deque)
+        self._waits = collections.deque(maxlen=wait_samples)
+        self._granted_total = 0
+
+    @contextlib.contextmanager
+    def slot(self, user="anonymous", priority=PRIORITY_RESUME, timeout=None):
+        """Hold one LLM slot for the duration of the `with` block."""
+        self.acquire(user, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextlib.asynccontextmanager
+    async def async_slot(self, user="anonymous", priority=PRIORITY_RESUME, timeout=None):
+        """asyncio version of slot(): waits without blocking the event loop."""
+        await self.acquire_async(user, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, user="anonymous", priority=PRIORITY_RESUME, timeout=None):
+        event = threading.Event()
+        ticket = _Ticket(user, priority, event.set)
+        with self._lock:
+            self._enqueue(ticket)
+            self._dispatch()  # Grants it right away if there is a free slot
+
+        if event.wait(timeout):
+            return
+        with self._lock:
+            if ticket.granted:
+                return  # Granted just as we timed out
+            ticket.cancelled = True
+        raise Exception(_BUSY_MESSAGE)
+
+    async def acquire_async(self, user="anonymous", priority=PRIORITY_RESUME, timeout=None):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = _Ticket(user, priority, wake)
+        with self._lock:
+            self._enqueue(ticket)
+            self._dispatch()
+
+        try:
+            await asyncio.wait_for(granted, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if ticket.granted:
+                    return  # Granted just as we timed out
+                ticket.cancelled = True
+            raise Exception(_BUSY_MESSAGE)
+        except asyncio.CancelledError:
+            # The waiting task went away (e.g. client disconnected)
+            with self._lock:
+                was_granted = ticket.granted
+                ticket.cancelled = True
+            if was_granted:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    # ── Internals (called with the lock held) ──
+
+    def _enqueue(self, ticket):
+        users = self._queues[ticket.priority]
+        if ticket.user not in users:
+            users[ticket.user] = collections.deque()
+            self._turns[ticket.priority].append(ticket.user)
+        users[ticket.user].append(ticket)
+
+    def _next_ticket(self):
+        for priority in sorted(self._turns):
+            turns = self._turns[priority]
+            users = self._queues[priority]
+            while turns:
+                user = turns.popleft()
+                pending = users[user]
+                ticket = pending.popleft()
+                if pending:
+                    turns.append(user)  # Back of the line for this user's next request
+                else:
+                    del users[user]
+                if not ticket.cancelled:
+                    return ticket
+        return None
+
+    def _dispatch(self):
+        while self._in_flight < self.max_in_flight:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return
+            self._grant(ticket)
+            ticket.wake()
+
+    def _grant(self, ticket):
+        self._in_flight += 1
+        self._granted_total += 1
+        ticket.granted = True
+        self._waits.append(time.time() - ticket.enqueued_at)
+
+    def stats(self):
+        """Queue depth per priority, in-flight count and recent wait times."""
+        with self._lock:
+            depth = {
+                str(p): sum(
+                    1 for q in self._queues[p].values() for t in q if not t.cancelled
+                )
+                for p in sorted(self._queues)
+            }
+            waits = sorted(self._waits)
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queued": sum(depth.values()),
+            "queued_by_priority": depth,
+            "granted_total": self._granted_total,
+            "avg_wait_sec": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "p95_wait_sec": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+        }
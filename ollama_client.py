@@ -0,0 +1,126 @@
+"""
+Pooled HTTP clients for the Ollama API.
+
+One keep-alive connection pool is shared by every call instead of opening
+a new TCP connection per request. Transient failures (connection errors and
+502/503/504 while Ollama is loading or restarting a model) are retried with
+exponential backoff. Read timeouts are never retried: a generation that ran
+out of time would only run out of time again.
+
+`build_session` is the sync (requests) variant; `AsyncOllamaClient` is the
+asyncio (httpx) variant.
+"""
+import asyncio
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class _Retry(Retry):
+    """
+    Retry that re-raises read timeouts at once. urllib3 counts both read
+    timeouts and dropped/reset connections (ProtocolError) as read errors,
+    so `read=0` would also stop the latter from being retried.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        if isinstance(error, ReadTimeoutError):
+            raise error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def build_session(pool_size=10, retries=3, backoff=0.5):
+    """A requests.Session with a sized connection pool and retry policy."""
+    retry = _Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # Retry POSTs too: generation has no side effects
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class AsyncOllamaClient:
+    """
+    asyncio client for Ollama's /api/generate with the same pooling and
+    retry behaviour as build_session(). Requires httpx.
+    """
+
+    def __init__(self, url, pool_size=10, connect_timeout=5, read_timeout=600,
+                 retries=3, backoff=0.5):
+        import httpx
+
+        self._httpx = httpx
+        self.url = url
+        self.retries = retries
+        self.backoff = backoff
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    async def _retry_delay(self, attempt):
+        await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    def _is_transient(self, exc):
+        return isinstance(exc, (self._httpx.ConnectError, self._httpx.RemoteProtocolError))
+
+    async def generate(self, payload):
+        """POST a non-streaming request and return the decoded JSON body."""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._client.post(self.url, json=payload)
+            except Exception as e:
+                if attempt < self.retries and self._is_transient(e):
+                    await self._retry_delay(attempt)
+                    continue
+                raise
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                await self._retry_delay(attempt)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def stream(self, payload):
+        """
+        POST a streaming request and yield each decoded NDJSON chunk.
+        Only the connection attempt is retried; once chunks have been
+        yielded a failure is raised to the caller.
+        """
+        yielded = False
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._client.stream("POST", self.url, json=payload) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                        await self._retry_delay(attempt)
+                        continue
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line:
+                            yielded = True
+                            yield json.loads(line)
+                    return
+            except Exception as e:
+                if not yielded and attempt < self.retries and self._is_transient(e):
+                    await self._retry_delay(attempt)
+                    continue
+                raise
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,159 @@
+"""
+PDF text extraction with pdfplumber.
+
+pdfplumber is pure Python and CPU-heavy, so multi-page PDFs are split into
+page ranges that run in a process pool; short CVs stay in-process where the
+pool's overhead would cost more than it saves.
+
+Workers are spawned, and a spawned worker re-runs the main script before
+it takes work. Under `python app.py` that is app.py itself, Flask imports
+and all (about 0.4 s per worker, paid once: workers are kept). So app.py
+builds its caches, indexes, browser pool and job queue on first use
+(app.Lazy) rather than at import, and a worker never opens them.
+"""
+import atexit
+import concurrent.futures
+import multiprocessing
+import os
+import re
+import threading
+
+import pdfplumber
+
+_BOLD_RE = re.compile(r"bold|black|heavy|semibold|demi", re.IGNORECASE)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web process has threads (Flask workers, the
+            # browser pool) and forking a threaded process can deadlock. Spawned
+            # workers re-run the main script: it must be safe to import.
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _page_boxes(page):
+    # Font size and weight split words too, so each word has one style
+    words = page.extract_words(
+        x_tolerance=2, y_tolerance=2, keep_blank_chars=False,
+        extra_attrs=["size", "fontname"],
+    )
+    return {
+        "width": float(page.width),
+        "words": [
+            {
+                "text": w["text"],
+                "x0": float(w["x0"]),
+                "x1": float(w["x1"]),
+                "top": float(w["top"]),
+                "bottom": float(w["bottom"]),
+                "size": round(float(w["size"]), 1),
+                "bold": bool(_BOLD_RE.search(w["fontname"])),
+            }
+            for w in words
+        ],
+        # Fallback: try basic extract_text
+        "fallback_text": None if words else page.extract_text(),
+    }
+
+
+def _extract_page_range(pdf_path, start, stop):
+    """Pool worker: word boxes for pages[start:stop] (opens the PDF itself)."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_page_boxes(page) for page in pdf.pages[start:stop]]
+
+
+def extract_word_boxes(pdf_path, workers=None, parallel_min_pages=3):
+    """
+    Pull the positioned words out of every page.
+    Returns one dict per page, in page order: {"width", "words": [{text, x0,
+    x1, top, bottom, size, bold}], "fallback_text"} where fallback_text is
+    only set for pages with no words.
+
+    PDFs with at least `parallel_min_pages` pages are split into contiguous
+    page ranges, one per worker process.
+    """
+    workers = workers or os.cpu_count() or 1
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        if workers < 2 or page_count < parallel_min_pages:
+            return [_page_boxes(page) for page in pdf.pages]
+
+    chunks = min(workers, page_count)
+    bounds = [page_count * i // chunks for i in range(chunks + 1)]
+    pool = _get_pool(workers)
+    # map() yields results in submission order, so pages stay in order
+    results = pool.map(
+        _extract_page_range,
+        [pdf_path] * chunks,
+        bounds[:-1],
+        bounds[1:],
+    )
+    return [page for chunk in results for page in chunk]
+
+
+def words_to_text(word_list):
+    """Join words into lines, grouping by their (rounded) vertical position."""
+    if not word_list:
+        return ""
+    lines = []
+    current_y = None
+    current_line = []
+    for w_item in word_list:
+        y = round(w_item["top"] / 5) * 5
+        if current_y is not None and y != current_y:
+            lines.append(" ".join(current_line))
+            current_line = []
+        current_line.append(w_item["text"])
+        current_y = y
+    if current_line:
+        lines.append(" ".join(current_line))
+    return "\n".join(lines)
+
+
+def page_to_text(page):
+    """
+    Lay out one page's words as text, handling multi-column layouts
+    by splitting into left/right columns at the typical sidebar boundary.
+    Returns None for pages with nothing to contribute.
+    """
+    words = page["words"]
+    if not words:
+        return page["fallback_text"] or None
+
+    # Split into columns
+    mid = page["width"] * 0.35  # Typical sidebar boundary
+
+    left_words = sorted(
+        [x for x in words if x["x0"] < mid],
+        key=lambda x: (round(x["top"] / 5) * 5, x["x0"]),
+    )
+    right_words = sorted(
+        [x for x in words if x["x0"] >= mid],
+        key=lambda x: (round(x["top"] / 5) * 5, x["x0"]),
+    )
+
+    left_text = words_to_text(left_words)
+    right_text = words_to_text(right_words)
+
+    combined = ""
+    if left_text.strip():
+        combined += "=== SIDEBAR ===\n" + left_text + "\n\n"
+    if right_text.strip():
+        combined += "=== MAIN CONTENT ===\n" + right_text
+    return combined
+
+
+def pages_to_text(pages):
+    """Join the laid-out text of every page."""
+    page_texts = [page_to_text(p) for p in pages]
+    return "\n\n".join(t for t in page_texts if t is not None)
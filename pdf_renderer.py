@@ -0,0 +1,321 @@
+"""
+Long-lived Chromium pool for PDF rendering.
+
+Launching Playwright + Chromium costs 1-3 seconds, so instead of doing it for
+every CV we keep a few browsers (each with a few open pages) alive on a
+dedicated asyncio loop thread and lend pages out to render calls.
+"""
+import asyncio
+import base64
+import functools
+import threading
+from pathlib import Path
+
+
+class _BrowserSlot:
+    """One Chromium instance and the pages opened in it."""
+
+    def __init__(self, index):
+        self.index = index
+        self.browser = None
+        self.pages = []
+        self.renders = 0
+        self.in_use = 0
+        self.crashed = False
+        self.restarting = False
+        self.restarts = 0
+        self.on_crash = None
+
+    def needs_restart(self, max_renders):
+        if self.crashed or self.browser is None or not self.browser.is_connected():
+            return True
+        return max_renders > 0 and self.renders >= max_renders
+
+
+class BrowserPool:
+    """
+    A pool of warm Chromium browsers that render calls borrow pages from.
+
+    - `browsers` × `pages_per_browser` renders can run at once.
+    - A browser is restarted after `max_renders` renders, or as soon as it
+      crashes/disconnects. Restarts wait until its pages are all returned.
+    - Render calls are sync and can come from any thread (e.g. Flask workers).
+    """
+
+    def __init__(self, browsers=2, pages_per_browser=2, max_renders=200,
+                 health_check_interval=30):
+        self.browsers = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.max_renders = max_renders
+        self.health_check_interval = health_check_interval
+
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._slots = []
+        self._idle = None  # asyncio.Queue of (slot, page)
+        self._health_task = None
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._total_renders = 0
+
+    # ── Lifecycle ──
+
+    def start(self):
+        """Start the loop thread and launch the browsers (idempotent)."""
+        with self._start_lock:
+            if self._started:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="browser-pool", daemon=True
+            )
+            self._thread.start()
+            try:
+                self._submit(self._start()).result()
+            except Exception:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+                self._loop = None
+                self._thread = None
+                raise
+            self._started = True
+
+    def shutdown(self):
+        """Close every browser and stop the loop thread."""
+        with self._start_lock:
+            if not self._started:
+                return
+            try:
+                self._submit(self._shutdown()).result(timeout=30)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            self._started = False
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+        self._slots = [_BrowserSlot(i) for i in range(self.browsers)]
+        for slot in self._slots:
+            await self._launch(slot)
+        self._health_task = self._loop.create_task(self._health_check_loop())
+
+    async def _shutdown(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for slot in self._slots:
+            await self._close(slot)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self, slot):
+        browser = await self._playwright.chromium.launch()
+        slot.browser = browser
+        slot.crashed = False
+        slot.renders = 0
+
+        def _on_crash(*_):
+            # Ignore events from a browser this slot has already replaced
+            if slot.browser is browser:
+                slot.crashed = True
+
+        browser.on("disconnected", _on_crash)
+        slot.on_crash = _on_crash
+        slot.pages = []
+        for _ in range(self.pages_per_browser):
+            page = await browser.new_page()
+            page.on("crash", _on_crash)
+            slot.pages.append(page)
+            self._idle.put_nowait((slot, page))
+
+    async def _close(self, slot):
+        if slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+        slot.browser = None
+        slot.pages = []
+
+    async def _restart(self, slot):
+        """Replace a crashed or worn-out browser. Only called with no pages lent out."""
+        slot.restarting = True
+        try:
+            await self._close(slot)
+            slot.restarts += 1
+            await self._launch(slot)
+        except Exception:
+            # Leave the slot marked as broken; the health check retries it.
+            slot.crashed = True
+        finally:
+            slot.restarting = False
+
+    # ── Borrow / return ──
+
+    async def _acquire(self):
+        while True:
+            slot, page = await self._idle.get()
+            if page not in slot.pages:
+                continue  # Stale entry from before a restart
+            if slot.needs_restart(self.max_renders):
+                self._maybe_restart(slot)
+                continue
+            if page.is_closed():
+                slot.pages.remove(page)
+                try:
+                    page = await slot.browser.new_page()
+                except BaseException:
+                    # Also on cancellation: the slot is a page short until restarted
+                    slot.crashed = True
+                    raise
+                page.on("crash", slot.on_crash)
+                slot.pages.append(page)
+            slot.in_use += 1
+            return slot, page
+
+    async def _release(self, slot, page, failed=False):
+        slot.in_use -= 1
+        slot.renders += 1
+        self._total_renders += 1
+        if failed and (page.is_closed() or not slot.browser.is_connected()):
+            slot.crashed = True
+        if slot.needs_restart(self.max_renders):
+            # The page is dropped here; the restart queues fresh ones.
+            self._maybe_restart(slot)
+        else:
+            self._idle.put_nowait((slot, page))
+
+    def _maybe_restart(self, slot):
+        # Wait for the last borrowed page before tearing the browser down,
+        # so renders already running on it are not cut off.
+        # The restart runs as a task so the caller that returned the page
+        # is not held up by a browser launch.
+        if slot.in_use == 0 and not slot.restarting:
+            slot.restarting = True
+            self._loop.create_task(self._restart(slot))
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for slot in self._slots:
+                if (slot.in_use == 0 and not slot.restarting
+                        and slot.needs_restart(self.max_renders)):
+                    await self._restart(slot)
+
+    # ── Rendering ──
+
+    async def _render(self, render_fn, timeout):
+        # The timeout covers waiting for a free page too: if every browser is
+        # restarting (or failing to relaunch) the call fails instead of hanging.
+        return await asyncio.wait_for(self._borrow_and_render(render_fn), timeout)
+
+    async def _borrow_and_render(self, render_fn):
+        slot, page = await self._acquire()
+        failed = False
+        try:
+            return await render_fn(page)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self._release(slot, page, failed=failed)
+
+    def run(self, render_fn, timeout=60):
+        """
+        Borrow a page and run `await render_fn(page)` on the pool's loop.
+        Blocks the calling thread until the render finishes, or raises
+        asyncio.TimeoutError after `timeout` seconds (waiting included).
+        """
+        self.start()
+        return self._submit(self._render(render_fn, timeout)).result()
+
+    async def run_async(self, render_fn, timeout=60):
+        """
+        asyncio version of run() for callers on their own event loop (e.g.
+        the ASGI app): awaits the render without blocking that loop.
+        """
+        if not self._started:
+            await asyncio.to_thread(self.start)
+        return await asyncio.wrap_future(self._submit(self._render(render_fn, timeout)))
+
+    def stats(self):
+        """Snapshot of pool health, useful for logging."""
+        return {
+            "browsers": [
+                {
+                    "index": s.index,
+                    "connected": bool(s.browser and s.browser.is_connected()),
+                    "renders": s.renders,
+                    "in_use": s.in_use,
+                    "restarts": s.restarts,
+                }
+                for s in self._slots
+            ],
+            "idle_pages": self._idle.qsize() if self._idle else 0,
+            "total_renders": self._total_renders,
+        }
+
+
+async def wait_until_ready(page, timeout_ms=5000):
+    """
+    Wait until stylesheets are in (the load event) and the page's web fonts
+    have finished loading (document.fonts.ready), bounded by `timeout_ms`.
+    Returns how long we actually waited, in ms. On timeout we render anyway;
+    the CSS falls back to sans-serif.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def _ready():
+        await page.wait_for_load_state("load", timeout=timeout_ms)
+        await page.evaluate("() => document.fonts.ready.then(() => document.fonts.status)")
+
+    try:
+        await asyncio.wait_for(_ready(), timeout_ms / 1000)
+    except Exception:
+        pass  # Timed out (or the page gave up on a font) - render what we have
+    return int((loop.time() - started) * 1000)
+
+
+# ── Embedded fonts ──
+
+_FONT_MIME = {".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf"}
+
+
+@functools.lru_cache(maxsize=None)
+def build_embedded_font_css(font_dir, family="Inter"):
+    """
+    Build @font-face rules for locally vendored font files, inlined as data
+    URIs so the page needs no network at all. Files are looked up as
+    `<family>-<weight>.<ext>` (e.g. Inter-400.woff2). Missing weights are
+    skipped; with no files at all this returns "" and the CSS falls back to
+    sans-serif. Cached, since the files don't change while the app runs.
+    """
+    font_dir = Path(font_dir)
+    if not font_dir.is_dir():
+        return ""
+
+    rules = []
+    for weight in (300, 400, 500, 600, 700):
+        for ext, mime in _FONT_MIME.items():
+            path = font_dir / f"{family}-{weight}{ext}"
+            if path.exists():
+                data = base64.b64encode(path.read_bytes()).decode("ascii")
+                rules.append(
+                    f"@font-face {{ font-family: '{family}'; font-style: normal; "
+                    f"font-weight: {weight}; font-display: block; "
+                    f"src: url(data:{mime};base64,{data}) format('{ext[1:]}'); }}"
+                )
+                break
+    return "\n".join(rules)
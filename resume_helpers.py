@@ -2,82 +2,289 @@
 import re
 import json
 import math
+from collections import Counter
 
-def compute_ats_score(cv_text, job_description):
+import numpy as np
+
+from skill_matcher import normalize_text
+
+# Basic keyword extraction: remove stop words, keep nouns/proper nouns
+# This is a simple implementation. For production, use NLTK or Spacy.
+STOP_WORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "in", "on", "at", "to", "for", "with",
+    "by", "of", "is", "are", "was", "were", "be", "been", "being", "have", "has",
+    "had", "do", "does", "did", "can", "could", "will", "would", "shall", "should",
+    "may", "might", "must", "i", "you", "he", "she", "it", "we", "they", "that",
+    "this", "these", "those", "from", "as", "if", "when", "where", "why", "how",
+    "all", "any", "both", "each", "few", "more", "most", "other", "some", "such",
+    "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very"
+})
+
+# Runs of ASCII letters/digits: the same tokens as replacing everything else
+# with spaces and splitting
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class JobMatrix:
     """
-    Compute an ATS matchup score based on keyword frequency and relevance.
-    Pure Python implementation — fast and deterministic.
+    Top keywords of many job descriptions, laid out as arrays so a CV can be
+    scored against all of them at once. Build with ATSScorer.job_matrix().
+    """
+
+    def __init__(self, tops, top_keywords):
+        self.tops = tops  # Per job: ATSScorer.top() output
+        self.vocab = {}
+        self.term_ids = np.full((len(tops), top_keywords), -1, dtype=np.int64)
+        self.counts = np.zeros((len(tops), top_keywords), dtype=np.float64)
+        self.idf = np.zeros((len(tops), top_keywords), dtype=np.float64)
+        for i, top in enumerate(tops):
+            for j, (word, count, idf) in enumerate(top):
+                self.term_ids[i, j] = self.vocab.setdefault(word, len(self.vocab))
+                self.counts[i, j] = count
+                self.idf[i, j] = idf
+
+    def __len__(self):
+        return len(self.tops)
+
+
+class ATSScorer:
     """
-    def extract_keywords(text):
-        # Basic keyword extraction: remove stop words, keep nouns/proper nouns
-        # This is a simple implementation. For production, use NLTK or Spacy.
-        stop_words = {
-            "a", "an", "the", "and", "or", "but", "in", "on", "at", "to", "for", "with",
-            "by", "of", "is", "are", "was", "were", "be", "been", "being", "have", "has",
-            "had", "do", "does", "did", "can", "could", "will", "would", "shall", "should",
-            "may", "might", "must", "i", "you", "he", "she", "it", "we", "they", "that",
-            "this", "these", "those", "from", "as", "if", "when", "where", "why", "how",
-            "all", "any", "both", "each", "few", "more", "most", "other", "some", "such",
-            "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very"
+    Keyword-frequency ATS scorer. Pure Python for single scores; the batch
+    methods score one CV against many job descriptions (or many CVs against
+    one) with NumPy.
+
+    Score: of the job description's `top_keywords` most important keywords,
+    the share of their occurrences the CV covers (each capped at the JD's
+    count), as a percentage, plus a flat `boost` when anything matched.
+
+    Without `idf` a keyword's importance is its count in the JD. With an
+    IDFIndex it is count x IDF over all job descriptions seen, so words
+    every posting uses ("experience", "team") stop crowding out the skills
+    that set this one apart.
+
+    Keywords are single words unless phrases are enabled: `skills` (a
+    SkillMatcher) turns dictionary skills such as "machine learning" or
+    "node.js" into single keywords, and `ngram_sizes` (e.g. (2, 3)) adds
+    word bigrams/trigrams that occur at least `ngram_min_count` times in a
+    job description. CVs are searched for every n-gram, so a repeated JD
+    phrase matches a CV that uses it once.
+    """
+
+    def __init__(self, top_keywords=20, report_limit=10, boost=10,
+                 min_length=3, stop_words=STOP_WORDS, idf=None,
+                 skills=None, ngram_sizes=(), ngram_min_count=2):
+        self.top_keywords = top_keywords
+        self.report_limit = report_limit
+        self.boost = boost
+        self.min_length = min_length
+        self.stop_words = stop_words
+        self.idf = idf
+        self.skills = skills
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.ngram_min_count = ngram_min_count
+
+    def keywords(self, text, ngram_min_count=None, ngram_vocab=None):
+        """Counter of the keywords in `text`, in order of first appearance."""
+        if self.skills is None and not self.ngram_sizes:
+            return Counter(
+                w for w in _TOKEN_RE.findall(text.lower())
+                if len(w) >= self.min_length and w not in self.stop_words
+            )
+        return self._phrase_keywords(
+            text, self.ngram_min_count if ngram_min_count is None else ngram_min_count, ngram_vocab
+        )
+
+    def _phrase_keywords(self, text, ngram_min_count, ngram_vocab=None):
+        # One left-to-right pass: skill spans become single terms, the text
+        # between them is tokenized as usual, and runs of adjacent kept words
+        # (not broken by stop words or punctuation) feed the n-grams.
+        text = normalize_text(text)
+        spans = self.skills.find(text) if self.skills is not None else []
+        terms = []
+        ngrams = Counter()
+        run = []
+
+        def flush_run():
+            for n in self.ngram_sizes:
+                for i in range(len(run) - n + 1):
+                    ngrams[" ".join(run[i:i + n])] += 1
+            run.clear()
+
+        pos = 0
+        for start, end, skill in spans + [(len(text), len(text), None)]:
+            prev_end = None
+            for m in _TOKEN_RE.finditer(text, pos, start):
+                if prev_end is not None and text[prev_end:m.start()] != " ":
+                    flush_run()
+                w = m.group()
+                if len(w) >= self.min_length and w not in self.stop_words:
+                    terms.append(w)
+                    run.append(w)
+                else:
+                    flush_run()
+                prev_end = m.end()
+            flush_run()
+            if skill is not None:
+                terms.append(skill)
+            pos = end
+
+        counts = Counter(terms)
+        for gram, count in ngrams.items():
+            if count >= ngram_min_count and (ngram_vocab is None or gram in ngram_vocab):
+                counts[gram] += count
+        return counts
+
+    def cv_keywords(self, cv_text, ngram_vocab=None):
+        """
+        Keywords of a CV: like keywords(), but every n-gram counts, since
+        the job description decides which phrases matter. `ngram_vocab`, if
+        given, keeps only the n-grams it contains.
+        """
+        return self.keywords(cv_text, ngram_min_count=1, ngram_vocab=ngram_vocab)
+
+    def is_ngram(self, keyword):
+        """Whether a keyword is a word n-gram (rather than a word or a dictionary skill)."""
+        return " " in keyword and (self.skills is None or keyword not in self.skills)
+
+    def top(self, text, counts=None):
+        """
+        The `top_keywords` most important keywords as [(word, count, idf)].
+        Pass `counts` if keywords(text) has already been computed.
+        """
+        if counts is None:
+            counts = self.keywords(text)
+        idf = self.idf.idf(list(counts)) if self.idf is not None else None
+        if idf is None:
+            # most_common keeps first-appearance order among equal counts
+            return [(w, c, 1.0) for w, c in counts.most_common(self.top_keywords)]
+        weighted = [(w, c, float(i)) for (w, c), i in zip(counts.items(), idf)]
+        weighted.sort(key=lambda item: item[1] * item[2], reverse=True)
+        return weighted[:self.top_keywords]
+
+    def _finish(self, ratio, top, hit_mask):
+        final_score = int(ratio * 100)
+        # Boost if important sections align (simple proxy)
+        if final_score > 0:
+            final_score = min(100, final_score + self.boost)
+        matched = [item[0] for item, hit in zip(top, hit_mask) if hit]
+        missing = [item[0] for item, hit in zip(top, hit_mask) if not hit]
+        return {
+            "score": final_score,
+            "matched": matched[:self.report_limit],
+            "missing": missing[:self.report_limit],
         }
-        
-        # Clean text
-        text = text.lower()
-        text = re.sub(r'[^a-z0-9\s]', ' ', text)
-        words = text.split()
-        
-        # Filter stop words and short words
-        keywords = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        # Count frequency
-        freq = {}
-        for w in keywords:
-            freq[w] = freq.get(w, 0) + 1
-            
-        return freq
-
-    jd_keywords = extract_keywords(job_description)
-    cv_keywords = extract_keywords(cv_text)
-    
-    if not jd_keywords:
-        return {"score": 0, "matched": [], "missing": []}
-        
-    score = 0
-    total_weight = 0
-    matched = []
-    missing = []
-    
-    # Analyze keywords from JD
-    sorted_jd = sorted(jd_keywords.items(), key=lambda x: x[1], reverse=True)
-    
-    # Top 20 keywords matter most
-    top_keywords = sorted_jd[:20]
-    
-    for word, weight in top_keywords:
-        total_weight += weight
-        if word in cv_keywords:
+
+    def score(self, cv_text, job_description):
+        """Score one CV against one job description."""
+        return self.score_coverage(self.coverage(cv_text, job_description))
+
+    def coverage(self, cv_text, job_description):
+        """
+        The job description's top keywords with how often the CV has each,
+        as [(word, count, idf, cv count)].
+        """
+        top = self.top(job_description)
+        if not top:
+            return []
+        cv_keywords = self.cv_keywords(cv_text)
+        return [(word, weight, idf, cv_keywords.get(word, 0)) for word, weight, idf in top]
+
+    def score_coverage(self, coverage):
+        """The score() result for a coverage() list."""
+        if not coverage:
+            return {"score": 0, "matched": [], "missing": []}
+        score = 0
+        total_weight = 0
+        hit_mask = []
+        for word, weight, idf, count in coverage:
+            total_weight += weight * idf
             # Count matches up to the required frequency
-            count = cv_keywords[word]
-            match_score = min(count, weight)
-            score += match_score
-            matched.append(word)
-        else:
-            missing.append(word)
-            
-    final_score = 0
-    if total_weight > 0:
-        final_score = int((score / total_weight) * 100)
-    
-    # Boost/Penalty logic
-    # Boost if important sections align (simple proxy)
-    if final_score > 0:
-        final_score = min(100, final_score + 10) # Base boost for structure
-        
-    return {
-        "score": final_score,
-        "matched": matched[:10], # Top 10 matched
-        "missing": missing[:10]  # Top 10 missing
-    }
+            score += min(count, weight) * idf
+            hit_mask.append(count > 0)
+        return self._finish(score / total_weight, coverage, hit_mask)
+
+    def job_matrix(self, job_descriptions):
+        """Pre-process job descriptions once, for repeated score_jobs() calls."""
+        return JobMatrix([self.top(jd) for jd in job_descriptions], self.top_keywords)
+
+    def score_jobs(self, cv_text, jobs):
+        """
+        Score one CV against many job descriptions. `jobs` is a list of texts
+        or a JobMatrix from job_matrix(). Returns one result per job, in order.
+        """
+        if not isinstance(jobs, JobMatrix):
+            jobs = self.job_matrix(jobs)
+        if not len(jobs):
+            return []
+        cv_keywords = self.cv_keywords(cv_text)
+
+        # One extra zero slot at the end: padding ids (-1) index it
+        cv_counts = np.zeros(len(jobs.vocab) + 1, dtype=np.float64)
+        for word, idx in jobs.vocab.items():
+            cv_counts[idx] = cv_keywords.get(word, 0)
+
+        counts = cv_counts[jobs.term_ids]
+        totals = (jobs.counts * jobs.idf).sum(axis=1)
+        covered = (np.minimum(counts, jobs.counts) * jobs.idf).sum(axis=1)
+        ratios = np.divide(covered, totals, out=np.zeros_like(totals), where=totals > 0)
+        hits = counts > 0
+        return [
+            self._finish(ratios[i], top, hits[i]) if top else {"score": 0, "matched": [], "missing": []}
+            for i, top in enumerate(jobs.tops)
+        ]
+
+    def score_cvs(self, cv_texts, job_description):
+        """Score many CVs against one job description. Returns one result per CV."""
+        top = self.top(job_description)
+        if not top:
+            return [{"score": 0, "matched": [], "missing": []} for _ in cv_texts]
+        if not cv_texts:
+            return []
+        words = [word for word, _, _ in top]
+        weights = np.array([count for _, count, _ in top], dtype=np.float64)
+        idf = np.array([i for _, _, i in top], dtype=np.float64)
+
+        counters = [self.cv_keywords(text) for text in cv_texts]
+        counts = np.array(
+            [[c.get(word, 0) for word in words] for c in counters], dtype=np.float64
+        )
+        ratios = (np.minimum(counts, weights) * idf).sum(axis=1) / (weights * idf).sum()
+        hits = counts > 0
+        return [self._finish(ratios[i], top, hits[i]) for i in range(len(cv_texts))]
+
+
+_default_scorer = ATSScorer()
+
+
+def compute_ats_score(cv_text, job_description, scorer=None):
+    """
+    Compute an ATS matchup score based on keyword frequency and relevance.
+    Pure Python implementation — fast and deterministic.
+    Pass `scorer` to use e.g. an IDF-weighted ATSScorer instead of the default.
+    """
+    return (scorer or _default_scorer).score(cv_text, job_description)
+
+def flatten_resume_data(resume_data):
+    """
+    Flatten structured resume data (as produced by normalize_resume_data)
+    into plain text, one string value per line, so it can be scored with
+    compute_ats_score just like an extracted CV.
+    """
+    lines = []
+
+    def walk(value):
+        if isinstance(value, str):
+            if value.strip():
+                lines.append(value.strip())
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(resume_data)
+    return "\n".join(lines)
 
 def format_cover_letter(data):
     """Format cover letter JSON into plain text if needed."""
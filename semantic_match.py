@@ -0,0 +1,151 @@
+"""
+Semantic keyword matching with a local embedding model.
+
+Exact keyword overlap misses paraphrases: a JD asking for "customer
+support" never matches a CV that says "client service". SemanticMatcher
+embeds the JD keywords the exact match missed and the CV's lines (via
+Ollama's /api/embed), and gives a missed keyword partial credit when some
+line of the CV is close enough in meaning.
+
+Embeddings are cached by text hash, so a CV scored against many job
+descriptions is embedded once, and all cache misses of a request go to
+Ollama in a single batched call. Similarities for every (keyword, line)
+pair come from one matrix product.
+"""
+import base64
+import re
+
+import numpy as np
+
+from cache_store import content_key
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+def text_chunks(text, max_words=12):
+    """
+    Split a CV into the units that get embedded: lines and sentences, with
+    long ones cut into windows of `max_words`. Short windows keep a keyword
+    from being diluted by the rest of a long bullet. Duplicates are dropped.
+    """
+    chunks = []
+    for piece in _SENTENCE_RE.split(text):
+        words = piece.split()
+        for i in range(0, len(words), max_words):
+            chunk = " ".join(words[i:i + max_words])
+            if len(chunk) >= 3:
+                chunks.append(chunk)
+    return list(dict.fromkeys(chunks))
+
+
+class OllamaEmbedder:
+    """
+    Embeds texts with Ollama's /api/embed. embed() returns L2-normalized
+    float32 rows, so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, url, model, session, cache=None, batch_size=64, timeout=(5, 30)):
+        self.url = url
+        self.model = model
+        self.session = session
+        self.cache = cache
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def _key(self, text):
+        return content_key("embed", self.model, text)
+
+    def embed(self, texts):
+        """Embedding matrix, one row per text, in order."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [self._key(t) for t in texts]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        vectors = {key: self._decode(blob) for key, blob in cached.items()}
+
+        missing = list(dict.fromkeys(t for t, key in zip(texts, keys) if key not in vectors))
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            fresh = self._request(batch)
+            new = {self._key(t): v for t, v in zip(batch, fresh)}
+            vectors.update(new)
+            if self.cache is not None:
+                self.cache.set_many((key, self._encode(v)) for key, v in new.items())
+
+        matrix = np.stack([vectors[key] for key in keys])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1)
+
+    def _request(self, texts):
+        response = self.session.post(
+            self.url, json={"model": self.model, "input": texts}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        embeddings = response.json().get("embeddings") or []
+        if len(embeddings) != len(texts):
+            raise Exception(
+                f"Embedding model '{self.model}' returned {len(embeddings)} vectors for {len(texts)} texts."
+            )
+        return [np.asarray(e, dtype=np.float32) for e in embeddings]
+
+    @staticmethod
+    def _encode(vector):
+        # float32 bytes as base64: a quarter the size of a JSON float list
+        return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode(blob):
+        return np.frombuffer(base64.b64decode(blob), dtype=np.float32)
+
+
+class SemanticMatcher:
+    """
+    Partial credit for JD keywords a CV expresses in other words. A missed
+    keyword whose best cosine similarity to a CV line reaches `threshold`
+    is credited `credit` * similarity of its weight.
+    """
+
+    def __init__(self, embedder, threshold=0.75, credit=0.8, max_chunk_words=12):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.credit = credit
+        self.max_chunk_words = max_chunk_words
+
+    def score(self, cv_text, coverage, keyword_score):
+        """
+        `coverage` is ATSScorer.coverage() for this CV and JD, and
+        `keyword_score` the exact-match score computed from it. Returns
+        {"score", "matched"}: the score with semantic credit added, and the
+        credited keywords with their similarity and the CV line behind it.
+        """
+        total = sum(weight * idf for _, weight, idf, _ in coverage)
+        partial = [
+            (word, weight, idf, count) for word, weight, idf, count in coverage if count < weight
+        ]
+        chunks = text_chunks(cv_text, self.max_chunk_words)
+        if not total or not partial or not chunks:
+            return {"score": keyword_score, "matched": []}
+
+        vectors = self.embedder.embed([word for word, _, _, _ in partial] + chunks)
+        similarity = vectors[:len(partial)] @ vectors[len(partial):].T
+        best = similarity.argmax(axis=1)
+        best_similarity = similarity[np.arange(len(partial)), best]
+
+        extra = 0.0
+        matched = []
+        for (word, weight, idf, count), line, sim in zip(partial, best, best_similarity):
+            if sim < self.threshold:
+                continue
+            # Credit only what the exact match left uncovered
+            extra += (weight - count) * idf * self.credit * float(sim)
+            if count == 0:
+                matched.append({
+                    "keyword": word,
+                    "similarity": round(float(sim), 3),
+                    "evidence": chunks[line],
+                })
+        return {
+            "score": min(100, keyword_score + int(round(extra / total * 100))),
+            "matched": matched,
+        }
@@ -0,0 +1,150 @@
+"""
+Multi-word skill matching with an Aho–Corasick automaton.
+
+Splitting text on non-alphanumerics mangles skills such as "machine
+learning", "C++", "Node.js" or "CI/CD". SkillMatcher compiles a skill
+dictionary (with aliases) into one character-level automaton and finds
+every occurrence in a single pass over the text, so the cost grows with
+the text, not with the size of the dictionary.
+
+Dictionary file format (data/skills.txt): one skill per line, aliases after
+"|" (the first name is the canonical one reported), lines starting with "#"
+are comments:
+
+    node.js | nodejs | node js
+    ci/cd | cicd
+"""
+import re
+from pathlib import Path
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace runs, as the automaton expects."""
+    return _WHITESPACE_RE.sub(" ", text.lower())
+
+
+class AhoCorasick:
+    """Character-level automaton over a fixed set of patterns."""
+
+    def __init__(self, patterns):
+        # patterns: {pattern string: value}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]   # (pattern length, value) if a pattern ends here
+        self._link = [0]     # Nearest node on the fail chain with an output
+        for pattern, value in patterns.items():
+            self._insert(pattern, value)
+        self._build_links()
+
+    def _insert(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._link.append(0)
+            node = nxt
+        self._out[node] = (len(pattern), value)
+
+    def _build_links(self):
+        # Breadth-first, so a node's fail target is finished before the node
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target
+                self._link[child] = target if self._out[target] else self._link[target]
+                queue.append(child)
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every pattern occurrence, overlaps included."""
+        goto, fail, out, link = self._goto, self._fail, self._out, self._link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if out[node] else link[node]
+            while hit:
+                length, value = out[hit]
+                yield i + 1 - length, i + 1, value
+                hit = link[hit]
+
+    def __len__(self):
+        return len(self._goto)
+
+
+class SkillMatcher:
+    """Finds dictionary skills in normalized text, reporting canonical names."""
+
+    def __init__(self, skills):
+        # skills: {canonical name: [aliases]}
+        patterns = {}
+        for canonical, aliases in skills.items():
+            for name in [canonical, *aliases]:
+                name = normalize_text(name).strip()
+                if not name:
+                    continue
+                patterns.setdefault(name, canonical)
+                if " " in name:
+                    patterns.setdefault(name.replace(" ", "-"), canonical)
+        self.skills = sorted(skills)
+        self._names = frozenset(self.skills)
+        self._automaton = AhoCorasick(patterns)
+
+    @classmethod
+    def from_file(cls, path):
+        skills = {}
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue  # "#" only at the start: "c#" is a skill
+            names = [n.strip() for n in line.split("|") if n.strip()]
+            canonical = normalize_text(names[0])
+            skills.setdefault(canonical, []).extend(names[1:])
+        return cls(skills)
+
+    def find(self, text):
+        """
+        Skill occurrences in `text` (already normalize_text()-ed) as sorted,
+        non-overlapping (start, end, skill) spans. Overlaps resolve to the
+        leftmost, then longest, match ("c++" wins over "c"); alphanumeric
+        pattern edges must sit on word boundaries ("java" does not match
+        inside "javascript").
+        """
+        candidates = [
+            (start, end, skill)
+            for start, end, skill in self._automaton.iter_matches(text)
+            if self._on_boundary(text, start, end)
+        ]
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        spans = []
+        last_end = 0
+        for start, end, skill in candidates:
+            if start >= last_end:
+                spans.append((start, end, skill))
+                last_end = end
+        return spans
+
+    @staticmethod
+    def _on_boundary(text, start, end):
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self.skills)
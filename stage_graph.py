@@ -0,0 +1,125 @@
+"""
+Minimal DAG executor for request pipelines.
+
+Stages are plain callables wired together by name. A stage starts on the
+executor as soon as every stage it depends on has finished, so independent
+work (e.g. ATS scoring and the LLM call) overlaps instead of running in
+sequence. run() returns once the *critical* stages are done; non-critical
+stages (cleanup, housekeeping) keep running in the background.
+"""
+import concurrent.futures
+import threading
+import time
+
+
+class _Stage:
+    __slots__ = (
+        "name", "fn", "after", "critical", "future", "claimed", "started_at", "finished_at",
+    )
+
+    def __init__(self, name, fn, after, critical):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.critical = critical
+        self.future = concurrent.futures.Future()
+        self.claimed = False  # Set once the stage has been started or failed
+        self.started_at = None
+        self.finished_at = None
+
+
+class StageGraph:
+    """
+    Build with add(), then run() once.
+
+        graph = StageGraph()
+        graph.add("llm", call_llm)
+        graph.add("parse", parse, after=("llm",))   # parse(llm_result)
+        graph.add("cleanup", remove_upload, critical=False)
+        results = graph.run(executor)                # {"llm": ..., "parse": ...}
+
+    A stage is called with the results of its `after` stages, in order. If a
+    stage fails, every stage depending on it fails with the same exception.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def add(self, name, fn, after=(), critical=True):
+        # Dependencies must already exist, which also rules out cycles
+        for dep in after:
+            if dep not in self._stages:
+                raise Exception(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = _Stage(name, fn, tuple(after), critical)
+
+    def run(self, executor, timeout=None):
+        """
+        Start every stage and block until the critical ones finish.
+        Returns {name: result} for the critical stages; re-raises the first
+        critical failure.
+        """
+        self._executor = executor
+        for stage in list(self._stages.values()):
+            if not stage.after:
+                stage.claimed = True
+                self._start(stage)
+
+        critical = [s for s in self._stages.values() if s.critical]
+        done, pending = concurrent.futures.wait(
+            [s.future for s in critical],
+            timeout=timeout,
+            return_when=concurrent.futures.FIRST_EXCEPTION,
+        )
+        for stage in critical:
+            if stage.future in done and stage.future.exception() is not None:
+                raise stage.future.exception()
+        if pending:
+            raise Exception("Pipeline timed out.")
+        return {s.name: s.future.result() for s in critical}
+
+    def timings(self):
+        """Milliseconds spent in each finished stage."""
+        return {
+            s.name: round((s.finished_at - s.started_at) * 1000)
+            for s in self._stages.values()
+            if s.started_at is not None and s.finished_at is not None
+        }
+
+    # ── Internals ──
+
+    def _start(self, stage):
+        args = [self._stages[dep].future.result() for dep in stage.after]
+        stage.started_at = time.time()
+        inner = self._executor.submit(stage.fn, *args)
+        inner.add_done_callback(lambda f, stage=stage: self._finish(stage, f))
+
+    def _finish(self, stage, inner):
+        stage.finished_at = time.time()
+        if inner.exception() is not None:
+            stage.future.set_exception(inner.exception())
+        else:
+            stage.future.set_result(inner.result())
+        self._release_dependents(stage)
+
+    def _release_dependents(self, finished):
+        ready, failed = [], []
+        with self._lock:
+            for stage in self._stages.values():
+                if stage.claimed or finished.name not in stage.after:
+                    continue
+                deps = [self._stages[d].future for d in stage.after]
+                if not all(f.done() for f in deps):
+                    continue
+                stage.claimed = True
+                error = next((f.exception() for f in deps if f.exception() is not None), None)
+                if error is not None:
+                    failed.append((stage, error))
+                else:
+                    ready.append(stage)
+        for stage, error in failed:
+            stage.future.set_exception(error)
+            self._release_dependents(stage)
+        for stage in ready:
+            self._start(stage)